@@ -1,7 +1,16 @@
-import csv, os, shutil, heapq
-import random
+import csv, os, re, shutil, heapq, sqlite3, bisect, time, glob, io, pickle, hashlib, operator, atexit, weakref, sys, functools, tempfile
+from collections import OrderedDict, Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime as dt
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, CardBatch falls back to plain Python without it
+    np = None
+
+#columns of a deck csv, decks made before next_due was added have only the first 8 columns
+DECK_HEADER = ["question", "answer", "date_created","cur_interval","ease_factor","times_reviewed","times_failed","times_correct","next_due"]
+
 class Queue:
     def __init__(self):
         self.queue = []
@@ -93,28 +102,128 @@ class GraphAdjL:  #graph for adj List
                  if n not in visited:
                      stack.push(n)
 
+class ImplicitGraph:
+    def __init__(self,attribute):
+        """
+        A complete graph of cards where every card is a neighbor of every other card. The edges are never stored,
+        instead the cards are kept in a PriorityQueue ordered by an attribute so the best neighbor of a card is found
+        in O(log n) without looking at every card
+
+        Parameters:
+        attribute (str): The card attribute that ranks the cards, higher is better
+
+        Returns:
+        None
+        """
+        self.attribute = attribute
+        self.order = PriorityQueue()
+
+    def addVertex(self,card,value=None):
+        if value is None:
+            value = getattr(card, self.attribute)
+        self.order.enqueue(-value, card)
+
+    def updateVertex(self,card):
+        """
+        Moves a card to its new place in the order after its attribute changed
+
+        Parameters:
+        card (Card): The card that changed
+
+        Returns:
+        None
+        """
+        if self.order.contains(card):
+            self.addVertex(card)
+
+    def removeVertex(self,card):
+        self.order.remove(card)
+
+    def hasVertex(self,card):
+        return self.order.contains(card)
+
+    def isEmpty(self):
+        return self.order.isEmpty()
+
+    def bestNeighbor(self,card,visited):
+        """
+        Finds the unvisited neighbor of a card with the highest attribute
+
+        Parameters:
+        card (Card): The card to find the best neighbor of, or None for the best card in the graph
+        visited (set): A set containing cards that are already visited
+
+        Returns:
+        Card or None: The best neighbor, or None if every other card is visited
+        """
+        heap = self.order.heap
+        while True:
+            if not heap:
+                return None
+            if heap[0][2] is not card:
+                best = heap[0][2]
+            elif len(heap) == 1:
+                return None
+            else: #the card itself is on top, so its best neighbor is the better of the top's children
+                best = heap[1][2] if len(heap) == 2 or heap[1][:2] < heap[2][:2] else heap[2][2]
+
+            if best not in visited:
+                return best
+            self.order.remove(best)
+
 class HashTable:
-    def __init__(self,size):
+    def __init__(self,size=101,max_load=0.7):
         self.size = size
         self.table = [None] * self.size
         self.deleted = "deleted"
+        self.max_load = max_load #grow once keys and deleted markers fill this much of the table
+        self.count = 0 #keys in the table
+        self.used = 0 #keys and deleted markers in the table
+        self.operations = 0
+        self.total_probes = 0
+        self.max_probe = 0
 
     def hashFunction(self,key):
         return abs(hash(key)) % self.size
 
+    def recordProbe(self,probes):
+        self.operations += 1
+        self.total_probes += probes
+        if probes > self.max_probe:
+            self.max_probe = probes
+
     def insert(self,key,card):
+        if self.used + 1 > self.size * self.max_load:
+            #only grow if the table is full of keys, if it is mostly deleted markers rehashing is enough
+            self.resize(self.size * 2 + 1 if self.count + 1 > self.size * self.max_load / 2 else self.size)
+
         #hash key to find index
         index = self.hashFunction(key)
         count = 0
+        free_index = None
 
-        #check is hashed index free? if so then we put key,value there
+        #look for the key, remembering the first deleted spot in case the key is not in the table
         while count < self.size:
-            if self.table[index] is None or self.table[index] == self.deleted or self.table[index][0] == key:
+            if self.table[index] is None:
+                break
+            if self.table[index] == self.deleted:
+                if free_index is None:
+                    free_index = index
+            elif self.table[index][0] == key:
                 self.table[index] = (key,card)
+                self.recordProbe(count + 1)
                 return
             #if not linear probe keep checking the next index for a spot wrap around if nessasary
             index = (index + 1) % self.size
             count += 1
+        self.recordProbe(count + 1)
+
+        if free_index is not None:
+            index = free_index
+        else:
+            self.used += 1
+        self.table[index] = (key,card)
+        self.count += 1
 
     def get(self,key):
         #hash out initial index
@@ -123,11 +232,14 @@ class HashTable:
 
         while count < self.size:
             if self.table[index] is None:
+                self.recordProbe(count + 1)
                 return None
             if self.table[index] != self.deleted and self.table[index][0] == key:
+                self.recordProbe(count + 1)
                 return self.table[index][0],self.table[index][1]
             index = (index + 1) % self.size
             count += 1
+        self.recordProbe(count)
         return None
 
     def delete(self,key):
@@ -136,207 +248,484 @@ class HashTable:
 
         while count < self.size:
             if self.table[index] is None:
+                self.recordProbe(count + 1)
                 return None
             if self.table[index] != self.deleted and self.table[index][0] == key:
+                self.recordProbe(count + 1)
                 poppedValue = self.table[index]
                 self.table[index] = self.deleted
+                self.count -= 1
                 return poppedValue
             index = (index + 1) % self.size
             count += 1
+        self.recordProbe(count)
         return None
 
-class PriorityQueue:
-    def __init__(self):
-        self.heap = []
+    def resize(self,size):
+        """
+        Rehashes every key into a new table, which also clears out the deleted markers
 
-    def isEmpty(self):
-        return len(self.heap) == 0
+        Parameters:
+        size (int): The size of the new table
 
-    def enqueue(self,priority, data):
-        heapq.heappush(self.heap,(priority,data))
+        Returns:
+        None
+        """
+        old_table = self.table
+        self.size = size
+        self.table = [None] * self.size
+        self.count = 0
+        self.used = 0
+        for entry in old_table:
+            if entry is not None and entry != self.deleted:
+                index = self.hashFunction(entry[0])
+                while self.table[index] is not None:
+                    index = (index + 1) % self.size
+                self.table[index] = entry
+                self.count += 1
+                self.used += 1
+
+    def probeStats(self):
+        """
+        Reports how full the table is and how far lookups have had to probe
 
-    def dequeue(self):
-        if self.heap:
-            return heapq.heappop(self.heap)[1]
+        Parameters:
+        None
 
-class Deck:
-    def __init__(self,path):
+        Returns:
+        dict: The size, key count, deleted marker count, load, average probe length, and longest probe of the table
         """
-        A basic deck class where the user can make decks, select a deck to use, study the selected deck, edit the selected deck,
-        export selected deck, and import other decks
+        return {
+            "size": self.size,
+            "count": self.count,
+            "deleted": self.used - self.count,
+            "load": self.used / self.size,
+            "average_probe": self.total_probes / self.operations if self.operations else 0,
+            "max_probe": self.max_probe,
+        }
+
+class SortedIndex:
+    def __init__(self,entries=(),load=256):
+        """
+        A sorted list of (key, row) entries split into buckets of about load entries each. Finding an entry's bucket
+        is a binary search over the bucket maximums, so adding or removing an entry takes O(log n) plus a shift
+        inside one small bucket instead of moving the whole list
 
         Parameters:
-        path (str): A string representing the directory where the decks are stored
+        entries (iterable): The (key, row) entries to start with
+        load (int): The number of entries per bucket (Defaults to 256)
 
         Returns:
         None
         """
-        self.path = path
-        self.deck = None
-        self.deckName = None
-        self.study_deck = DeckSchedule(1,"review_time")
-        self.hash_table = None
-        self.invalidChars = ["\\", "/", ":", "*", "?", '"', "<", ">","|"]  # characters that can not be in a file's name in windows
-        self.study_mode = "review_time"
-        self.card_threshold = 0.6  #default
+        self.load = load
+        entries = sorted(entries)
+        self.buckets = [entries[i:i + load] for i in range(0, len(entries), load)]
+        self.maxes = [bucket[-1] for bucket in self.buckets]
+        self.size = len(entries)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for bucket in self.buckets:
+            for key, row in bucket:
+                yield row
+
+    def add(self,key,row):
+        entry = (key, row)
+        self.size += 1
+        if not self.buckets:
+            self.buckets.append([entry])
+            self.maxes.append(entry)
+            return
+        index = min(bisect.bisect_left(self.maxes, entry), len(self.buckets) - 1)
+        bucket = self.buckets[index]
+        bisect.insort(bucket, entry)
+        self.maxes[index] = bucket[-1]
+        if len(bucket) > 2 * self.load: #split a bucket that has grown too big
+            self.buckets[index:index + 1] = [bucket[:self.load], bucket[self.load:]]
+            self.maxes[index:index + 1] = [bucket[self.load - 1], bucket[-1]]
+
+    def remove(self,key,row):
+        entry = (key, row)
+        index = bisect.bisect_left(self.maxes, entry)
+        if index == len(self.buckets):
+            return False
+        bucket = self.buckets[index]
+        position = bisect.bisect_left(bucket, entry)
+        if position == len(bucket) or bucket[position] != entry:
+            return False
+        del bucket[position]
+        self.size -= 1
+        if bucket:
+            self.maxes[index] = bucket[-1]
+        else:
+            del self.buckets[index]
+            del self.maxes[index]
+        return True
 
-    def makeDeck(self):
+    def irange(self,low=None,high=None):
         """
-        Generates a deck based on the users inputs as a csv file
+        Lists the rows whose keys are in a range, in key order
 
         Parameters:
-        None
+        low (any): The lowest key to include, or None to start at the first key (Defaults to None)
+        high (any): The key to stop before, or None to go to the last key (Defaults to None)
+
+        Returns:
+        generator: Yields the rows in the range
+        """
+        index = 0 if low is None else bisect.bisect_left(self.maxes, (low,))
+        position = 0 if low is None or index == len(self.buckets) else bisect.bisect_left(self.buckets[index], (low,))
+        while index < len(self.buckets):
+            bucket = self.buckets[index]
+            for key, row in bucket[position:]:
+                if high is not None and key >= high:
+                    return
+                yield row
+            index += 1
+            position = 0
+
+    def page(self,start,count,descending=False):
+        """
+        Lists one page of rows in key order without going through the entries before it one by one
+
+        Parameters:
+        start (int): The position of the first row of the page
+        count (int): The number of rows on the page
+        descending (bool): If True the positions count from the highest key (Defaults to False)
+
+        Returns:
+        list: The rows on the page
+        """
+        rows = []
+        if descending:
+            first = max(self.size - start - count, 0)
+            return self.page(first, self.size - start - first)[::-1]
+        index = 0
+        while index < len(self.buckets) and start >= len(self.buckets[index]):
+            start -= len(self.buckets[index])
+            index += 1
+        while index < len(self.buckets) and len(rows) < count:
+            rows.extend(row for key, row in self.buckets[index][start:start + count - len(rows)])
+            index += 1
+            start = 0
+        return rows
+
+class InvertedIndex:
+    def __init__(self,cards=()):
+        """
+        A token level index over the question and answer of every card, used for keyword searches
+
+        Parameters:
+        cards (iterable): The cards to index (Defaults to none)
 
         Returns:
         None
         """
-        deck = []
-        deck.append(["question", "answer", "date_created","cur_interval","ease_factor","times_reviewed","times_failed","times_correct"])  # header for the csv
-        existingDecks = os.listdir(self.path)
-        while True:
-            deckName = input("Name of the deck:\n")
+        self.postings = {} #token -> {card: times the token appears in the card}
+        self.documents = {} #card -> {token: times the token appears in the card}
+        self.tokens = None
+        for card in cards:
+            self.add(card)
+        self.tokens = sorted(self.postings) #sorted list of every token for prefix matching, sorted once after the first cards
+
+    def tokenize(self,text):
+        return re.findall(r"\w+", text.lower())
+
+    def add(self,card):
+        counts = {}
+        for token in self.tokenize(card.question + " " + card.answer):
+            counts[token] = counts.get(token, 0) + 1
+        self.documents[card] = counts
+        for token, count in counts.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                if self.tokens is not None:
+                    bisect.insort(self.tokens, token)
+            self.postings[token][card] = count
+
+    def remove(self,card):
+        counts = self.documents.pop(card, None)
+        if counts is None:
+            return
+        for token in counts:
+            posting = self.postings[token]
+            del posting[card]
+            if not posting: #no cards use the token anymore
+                del self.postings[token]
+                del self.tokens[bisect.bisect_left(self.tokens, token)]
+
+    def update(self,card):
+        self.remove(card)
+        self.add(card)
+
+    def prefixTokens(self,prefix):
+        """
+        Finds every indexed token that starts with a prefix
 
-            if any(char in deckName for char in self.invalidChars):  # if any invalid characters are in the deck name
-                print(f"The name can not contain:")
-                print(*self.invalidChars, sep=",")
-                print("\n")
+        Parameters:
+        prefix (str): The start of the tokens to find
 
-            elif deckName == "":
-                print("The deck must have a name!")
+        Returns:
+        list: The matching tokens
+        """
+        matches = []
+        index = bisect.bisect_left(self.tokens, prefix)
+        while index < len(self.tokens) and self.tokens[index].startswith(prefix):
+            matches.append(self.tokens[index])
+            index += 1
+        return matches
+
+    def search(self,query,prefix=True):
+        """
+        Finds the cards that contain every word of a query, ranked by how often the words appear in them
 
-            elif deckName + '.csv' in existingDecks:  # checks for duplicates
-                print("Duplicate deck name try another name!")
+        Parameters:
+        query (str): The words to search for
+        prefix (bool): If True a word also matches any token that starts with it (Defaults to True)
 
-            else:
-                break
+        Returns:
+        list: The matching cards, best match first
+        """
+        scores = None
+        for term in self.tokenize(query):
+            tokens = self.prefixTokens(term) if prefix else [term] if term in self.postings else []
+            matches = {}
+            for token in tokens:
+                for card, count in self.postings[token].items():
+                    matches[card] = matches.get(card, 0) + count
+
+            if scores is None:
+                scores = matches
+            else: #keep only the cards that matched every word so far
+                scores = {card: scores[card] + count for card, count in matches.items() if card in scores}
+            if not scores:
+                return []
+
+        if scores is None:
+            return []
+        return sorted(scores, key=lambda card: (-scores[card], card.row))
+
+class TrigramIndex:
+    def __init__(self,cards=()):
+        """
+        A character trigram index over card questions used for typo tolerant searches. A question that is at most k
+        edits from a query shares at least max(len(question), len(query)) + 2 - 3k trigrams with it, since each edit
+        changes at most 3 trigrams, so the edit distance is only worked out for the cards that share enough of them
 
-        card = self.makeCard()
-        deck.append(card)
+        Parameters:
+        cards (iterable): The cards to index (Defaults to none)
 
-        while len(deck) < 101:
-            if len(deck) == 101:
-                print("You have reached the maximum limit of 100 cards in this deck.")
-                break
+        Returns:
+        None
+        """
+        self.postings = {} #trigram -> cards whose question has it, a card is listed once for every time it has it
+        self.keys = {} #card -> the lower cased question it is indexed by
+        self.lengths = {} #length of a question -> set of cards, for short queries that may share no trigrams
+        for card in cards:
+            self.add(card)
 
-            choice = input("Do you want to add more cards?\n1): Yes:\n2): No:\n")
+    def trigrams(self,text):
+        """
+        Splits a string into its trigrams, padded with two spaces on each side
 
-            if choice == "2":
-                break
-            elif choice == "1":
-                card = self.makeCard()
-                deck.append(card)
-            else:
-                print("Invalid Input! Please enter '1' for Yes or '2' for No.")
+        Parameters:
+        text (str): The string to split
 
-        with open(self.path + "\\" + deckName + ".csv", "w", newline='') as f:
-            w = csv.writer(f)
-            w.writerows(deck)
+        Returns:
+        list: The len(text) + 2 trigrams of the string, in order
+        """
+        padded = "  " + text + "  "
+        return [padded[i:i + 3] for i in range(len(text) + 2)]
 
-    def makeCard(self):
+    def distance(self,a,b,limit=None):
         """
-        Generates a card based on the users inputs and adds it to the deck
+        Calculates the Levenshtein edit distance between two strings, stopping as soon as it is over a limit
 
         Parameters:
-        deck (arr): array of all cards to store as a csv
+        a (str): The first string
+        b (str): The second string
+        limit (int): The largest distance that matters, or None for no limit (Defaults to None)
 
         Returns:
-        None
+        int: The least number of insertions, deletions, and substitutions that turn a into b, or limit + 1 if that is
+        over the limit
         """
-        card = []
-        while True:
-            question = str(input("Question for the card:\n"))
-            if question == "":
-                print("The card must have a question!")
-            else:
-                break
-        while True:
-            answer = str(input("Answer for the card:\n"))
-            if answer == "":
-                print("The card must have a answer!")
+        if len(a) < len(b):
+            a, b = b, a
+        if limit is not None and len(a) - len(b) > limit:
+            return limit + 1
+        previous = list(range(len(b) + 1))
+        for i, char_a in enumerate(a, 1):
+            current = [i]
+            for j, char_b in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+            if limit is not None and min(current) > limit: #every later row is at least as far
+                return limit + 1
+            previous = current
+        return previous[-1]
+
+    def add(self,card):
+        key = card.question.lower()
+        self.keys[card] = key
+        for gram in self.trigrams(key):
+            posting = self.postings.get(gram)
+            if posting is None:
+                self.postings[gram] = [card]
             else:
-                break
-        now = str(dt.now().date()) + " " + str(dt.now().time())[:-7]  # gets current date and time
-        card.append(question)
-        card.append(answer)
-
-        cur_interval = 1
-        times_reviewed = 0
-        times_failed = 0
-        times_correct = 0
-        ease_factor = 2.5
+                posting.append(card)
+        self.lengths.setdefault(len(key), set()).add(card)
 
-        card.append(now)
-        card.append(cur_interval)
-        card.append(ease_factor)
-        card.append(times_reviewed)
-        card.append(times_correct)
-        card.append(times_failed)
+    def remove(self,card):
+        key = self.keys.pop(card, None)
+        if key is None:
+            return
+        for gram in self.trigrams(key):
+            posting = self.postings[gram]
+            posting.remove(card)
+            if not posting:
+                del self.postings[gram]
+        self.lengths[len(key)].discard(card)
+
+    def update(self,card):
+        self.remove(card)
+        self.add(card)
+
+    def search(self,query,limit=5,max_distance=None):
+        """
+        Finds the cards whose questions are closest to a query. The cards that share the most trigrams with the
+        query are checked first, and cards that can not be closer than the ones already found are skipped
 
-        return card
+        Parameters:
+        query (str): The lower cased string to search for
+        limit (int): The most cards to return (Defaults to 5)
+        max_distance (int): The largest edit distance a match can have, or None for no limit (Defaults to None)
 
-    def extractDeck(self):
+        Returns:
+        list: A list of (distance, card) pairs, closest first
         """
-        Extracts all information from the selected deck
+        if not self.keys or limit <= 0:
+            return []
+        #counts every time a card has one of the query's trigrams, which is never less than the trigrams they share
+        shared = Counter()
+        for gram in set(self.trigrams(query)):
+            posting = self.postings.get(gram)
+            if posting:
+                shared.update(posting)
+
+        if max_distance is None:
+            candidates = self.keys #any card can be among the closest
+        else:
+            least = 2 - 3 * max_distance #the fewest trigrams a match can share, plus the longer length
+            candidates = [card for card, count in shared.items() if count >= max(len(query), len(self.keys[card])) + least]
+            if len(query) + least <= 0: #a short query can match a short question without sharing a trigram
+                for length in range(max(len(query) - max_distance, 0), min(len(query) + max_distance, -least) + 1):
+                    candidates.extend(card for card in self.lengths.get(length, ()) if card not in shared)
+
+        best = [] #min heap of the closest cards found so far as (-distance, -row, card), the furthest on top
+        for card in sorted(candidates, key=lambda card: -shared[card]):
+            tolerance = max_distance
+            if len(best) == limit:
+                tolerance = -best[0][0] if tolerance is None else min(tolerance, -best[0][0])
+            dist = self.distance(query, self.keys[card], tolerance)
+            if tolerance is not None and dist > tolerance:
+                continue
+            entry = (-dist, -card.row, card)
+            if len(best) < limit:
+                heapq.heappush(best, entry)
+            elif entry[:2] > best[0][:2]:
+                heapq.heapreplace(best, entry)
+
+        return [(-dist, card) for dist, row, card in sorted(best, key=lambda entry: entry[:2], reverse=True)]
+
+class ReviewJournal:
+    def __init__(self,path,deckName,threshold=200):
+        """
+        An append-only log of review results for a deck. Every batch of answers adds one small record per card
+        instead of rewriting the whole deck csv, and the log is folded back into the csv by compact()
 
         Parameters:
-        None:
+        path (str): A string representing the directory where the decks are stored
+        deckName (str): The name of the deck's csv file
+        threshold (int): The number of records after which the log gets compacted (Defaults to 200)
 
         Returns:
-        deck: (arr): An array where the data from a csv is stored
+        None
         """
-        try:
-            deck = []
-            with open(self.path + self.deckName, "r") as text:
-                csv = text.readlines()
-                csv.pop(0)
-                for n, line in enumerate(csv, 1):
-                    line = line.replace("\n", "") #get rid of "\n"
-                    line = line.split(",")
-                    card = Card(line[0], line[1], line[2], n, line[3], float(line[4]), int(line[5]), int(line[6]),int(line[7]))
-                    self.study_deck.addCard(card,float(line[4]))
-                    deck.append(card)
+        self.path = path
+        self.deckName = deckName
+        self.file = os.path.join(path, deckName + ".journal")
+        self.threshold = threshold
+        self.count = 0
 
+    def append(self,cards):
+        """
+        Appends a record of the review values of each card to the end of the log in one write
 
-            self.deck = deck
-            self.hash_table = HashTable(101)
-            for card in self.deck:
-                self.hash_table.insert(card.question.lower(), card)
-            return self.deck
+        Parameters:
+        cards (iterable): The cards that were reviewed
 
-        except:
-            print("An error occurred")
+        Returns:
+        bool: True if the log has grown past its threshold and should be compacted, and False otherwise
+        """
+        records = [[card.row, card.cur_interval, card.ease_factor, card.times_reviewed, card.times_failed,
+                    card.times_correct, formatTimestamp(card.next_due)] for card in cards]
+        self.trimTorn()
+        with open(self.file, "a", newline='') as f:
+            w = csv.writer(f)
+            w.writerows(records)
+        self.count += len(records)
+        return self.count >= self.threshold
 
-    def selectDeck(self):
+    def records(self):
         """
-        Returns a string of the decks name that the user chose, if valid
+        Reads every complete record in the log
 
         Parameters:
         None
 
         Returns:
-        str: A string of the deck name the user chose
+        list: A list of [row, cur_interval, ease, times_reviewed, times_failed, times_correct, next_due] records
         """
-        existingDecks = os.listdir(self.path)
-        if not existingDecks:
-            print("There are no decks to select!\nYou can make decks at the main menu")
-            return
+        records = []
+        if not os.path.exists(self.file):
+            return records
+        with open(self.file, "r", newline="") as f:
+            lines = f.read().split("\n")
+        #the last line is empty when the log ends in a newline, otherwise it was cut off part way through being written
+        for line in csv.reader(lines[:-1]):
+            if self.validRecord(line):
+                records.append(line)
+        self.count = len(records)
+        return records
+
+    @staticmethod
+    def validRecord(line):
+        """
+        Checks that every field of a record can be read, logs from before next_due have 6 fields
 
-        else:
-            while True:
-                print("Select a deck:")
-                for idx, d in enumerate(existingDecks, 1):
-                    print(f"{idx}): {d[:-4]}")
-                deck_choice = input("")
-                if deck_choice.isnumeric() and 1 <= int(deck_choice) <= len(existingDecks):
-                    selectedDeck = existingDecks[int(deck_choice) - 1]
-                    self.deckName = selectedDeck
-                    return self.deckName
-                else:
-                    print("\nEnter a existing deck!")
+        Parameters:
+        line (arr): The fields of the record
 
-    def importDeck(self):
+        Returns:
+        bool: True if the record can be applied, and False otherwise
         """
-        Allows user to import a deck, if valid
+        if len(line) not in (6, 7):
+            return False
+        try:
+            int(line[0]), float(line[1]), float(line[2]), int(line[3]), int(line[4]), int(line[5])
+            if len(line) == 7:
+                dt.fromisoformat(line[6])
+        except ValueError:
+            return False
+        return True
+
+    def trimTorn(self):
+        """
+        Cuts a record that was cut off part way through being written from the end of the log, so the next record
+        starts on its own line instead of being joined onto it
 
         Parameters:
         None
@@ -344,29 +733,31 @@ class Deck:
         Returns:
         None
         """
-        deckImport = input("Enter the path to the deck you want to import:\n")
         try:
-            if not os.path.exists(deckImport):
-                print("File not found")
-                return
-
-            with open(deckImport, "r") as f:
-                text = f.read().strip()
-                if text.partition("\n")[0] != "question,answer,date_created,cur_interval,ease_factor,times_reviewed,times_failed,times_correct": #check for header
-                    print("Invalid file!")
+            with open(self.file, "rb+") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) == b"\n":
                     return
-                f.close()
-                filename = os.path.basename(deckImport)
-                destinationPath = os.path.join(self.path, filename)
-                shutil.copy(deckImport, destinationPath) #create a copy of the deck
-                print("Deck imported successfully")
+                f.seek(0)
+                f.truncate(f.read().rfind(b"\n") + 1)
+        except OSError: #no log yet or an empty one
+            pass
 
-        except Exception as e:
-            print(e)
+    def latest(self):
+        """
+        Finds the most recent logged review values of every card in the log
 
-    def exportDeck(self):
+        Parameters:
+        None
+
+        Returns:
+        dict: A dictionary of a card's csv row to its [cur_interval, ease, times_reviewed, times_failed, times_correct, next_due]
         """
-        Allows user to export existing decks, if valid
+        return {int(line[0]): line[1:] for line in self.records()}
+
+    def compact(self):
+        """
+        Folds the logged review values back into the deck's csv and clears the log
 
         Parameters:
         None
@@ -374,32 +765,1274 @@ class Deck:
         Returns:
         None
         """
-        cur_name = self.deckName
-        selectedDeck = self.selectDeck()
-        self.deckName = cur_name # resets deck name to original one
+        records = self.records()
+        if not records:
+            return
 
-        try:
-            deckExport = input("Enter the path to the deck you want to export to:\n")
-            if not os.path.isdir(deckExport):
-                print(f"'{deckExport}' is not a valid directory.")
-                return
+        with open(os.path.join(self.path, self.deckName), "r", newline="") as f:
+            rows = list(csv.reader(f))
+        if len(rows[0]) < len(DECK_HEADER): #add the next_due column to older decks, cards are due from when they were made
+            rows[0] = DECK_HEADER
+            for line in rows[1:]:
+                if len(line) < len(DECK_HEADER):
+                    line.append(line[2])
+        for line in records:
+            row = int(line[0])
+            if 1 <= row < len(rows):
+                rows[row][3:3 + len(line) - 1] = line[1:]
+
+        writeDeckRows(os.path.join(self.path, self.deckName), rows)
+        if os.path.exists(self.file):
+            os.remove(self.file)
+        self.count = 0
+
+class CsvDeckStore:
+    def __init__(self,path,deckName):
+        """
+        Stores a deck as a csv file, with review results kept in a ReviewJournal until they are compacted
 
-            shutil.copy(self.path + '\\' + selectedDeck, deckExport) #create a copy of the deck
-            print("Successful")
+        Parameters:
+        path (str): A string representing the directory where the decks are stored
+        deckName (str): The name of the deck's csv file
 
-        except Exception as e:
-            print(e)
+        Returns:
+        None
+        """
+        self.path = path
+        self.deckName = deckName
+        self.file = os.path.join(path, deckName)
+        self.journal = ReviewJournal(path, deckName)
 
-    def studyDeck(self):
+    def iterCards(self):
         """
-        A function where the user could study cards from the selected deck. The frequency of cards appearing is based on their review time
-        If a custom study mode is active then a custom study mode is selected.
+        Streams the cards in the deck one row at a time, with any uncompacted reviews applied
 
         Parameters:
         None
 
         Returns:
-        None
+        generator: Yields the deck's cards ordered by their row in the csv
+        """
+        #reviews that have not been compacted into the csv yet
+        reviews = self.journal.latest()
+        with open(self.file, "r", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None) #skip the header
+            for n, line in enumerate(reader, 1):
+                if n in reviews:
+                    line[3:3 + len(reviews[n])] = reviews[n]
+                next_due = parseTimestamp(line[8] if len(line) > 8 else line[2])
+                yield Card(line[0], line[1], line[2], n, line[3], float(line[4]), int(line[5]), int(line[6]),int(line[7]),next_due)
+
+    def loadCards(self):
+        """
+        Reads every card in the deck, with any uncompacted reviews applied
+
+        Parameters:
+        None
+
+        Returns:
+        list: A list of the deck's cards ordered by their row in the csv
+        """
+        return list(self.iterCards())
+
+    def updateMany(self,cards):
+        """
+        Records the new review values of many cards in the journal, compacting the journal into the csv once it
+        grows past its threshold. Appending costs the same however big the deck is, the csv is only rewritten when
+        the journal is compacted
+
+        Parameters:
+        cards (iterable): The cards that were reviewed
+
+        Returns:
+        None
+        """
+        if self.journal.append(cards):
+            self.journal.compact()
+
+    def updateText(self,card):
+        """
+        Writes a card's question and answer to its row in the csv
+
+        Parameters:
+        card (Card): The card that was edited
+
+        Returns:
+        None
+        """
+        with open(self.file, "r", newline="") as f:
+            rows = list(csv.reader(f))  # store rows for editing
+        rows[card.row][0] = card.question
+        rows[card.row][1] = card.answer
+        writeDeckRows(self.file, rows)
+
+    def appendCard(self,card_list):
+        """
+        Adds a new card to the end of the csv
+
+        Parameters:
+        card_list (arr): The card's values in the same order as the csv's columns
+
+        Returns:
+        None
+        """
+        with open(self.file, "a", newline='') as f:
+            w = csv.writer(f)
+            w.writerow(card_list)
+
+    def findRow(self,question):
+        return None  #the csv has no index, the deck's HashTable is used instead
+
+    def sortedRows(self,attributes,descending=False):
+        return None  #the csv has no index, the deck is sorted in memory instead
+
+    def flush(self):
+        """
+        Folds the journal back into the csv, called at the end of a study session
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.journal.compact()
+
+class SqliteDeckStore:
+    columns = {"question": "question", "answer": "answer", "date": "date_created", "next_due": "next_due"}
+
+    def __init__(self,path,deckName):
+        """
+        Stores a deck as a SQLite database where each card is a row indexed by question, answer, and date created,
+        so a review is a single row update instead of a rewrite of the whole deck
+
+        Parameters:
+        path (str): A string representing the directory where the decks are stored
+        deckName (str): The name of the deck's .db file
+
+        Returns:
+        None
+        """
+        self.path = path
+        self.deckName = deckName
+        self.file = os.path.join(path, deckName)
+        #the deck server uses a deck from worker threads, one at a time
+        self.connection = sqlite3.connect(self.file, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS cards (
+                row INTEGER PRIMARY KEY,
+                question TEXT NOT NULL,
+                question_key TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                date_created TEXT NOT NULL,
+                cur_interval REAL NOT NULL,
+                ease_factor REAL NOT NULL,
+                times_reviewed INTEGER NOT NULL,
+                times_failed INTEGER NOT NULL,
+                times_correct INTEGER NOT NULL,
+                next_due TEXT NOT NULL
+            );
+        """)
+        if "next_due" not in [column[1] for column in self.connection.execute("PRAGMA table_info(cards)")]:
+            #decks made before next_due was added, cards are due from when they were made
+            with self.connection:
+                self.connection.execute("ALTER TABLE cards ADD COLUMN next_due TEXT NOT NULL DEFAULT ''")
+                self.connection.execute("UPDATE cards SET next_due = date_created")
+        self.connection.executescript("""
+            CREATE INDEX IF NOT EXISTS cards_question_key ON cards (question_key);
+            CREATE INDEX IF NOT EXISTS cards_question ON cards (question);
+            CREATE INDEX IF NOT EXISTS cards_answer ON cards (answer);
+            CREATE INDEX IF NOT EXISTS cards_date_created ON cards (date_created);
+            CREATE INDEX IF NOT EXISTS cards_next_due ON cards (next_due);
+        """)
+
+    def iterCards(self):
+        """
+        Streams the cards in the deck one row at a time
+
+        Parameters:
+        None
+
+        Returns:
+        generator: Yields the deck's cards ordered by their row
+        """
+        cursor = self.connection.execute("SELECT row, question, answer, date_created, cur_interval, ease_factor, times_reviewed, "
+                                         "times_failed, times_correct, next_due FROM cards ORDER BY row")
+        for line in cursor:
+            yield Card(line[1], line[2], line[3], line[0], line[4], line[5], line[6], line[7], line[8], parseTimestamp(line[9]))
+
+    def loadCards(self):
+        """
+        Reads every card in the deck
+
+        Parameters:
+        None
+
+        Returns:
+        list: A list of the deck's cards ordered by their row
+        """
+        return list(self.iterCards())
+
+    def updateMany(self,cards):
+        """
+        Writes the review values of many cards in a single transaction
+
+        Parameters:
+        cards (iterable): The cards that were reviewed
+
+        Returns:
+        None
+        """
+        with self.connection:
+            self.connection.executemany("UPDATE cards SET cur_interval = ?, ease_factor = ?, times_reviewed = ?, times_failed = ?, "
+                                        "times_correct = ?, next_due = ? WHERE row = ?",
+                                        ((float(card.cur_interval), float(card.ease_factor), card.times_reviewed, card.times_failed,
+                                          card.times_correct, formatTimestamp(card.next_due), card.row) for card in cards))
+
+    def updateText(self,card):
+        """
+        Writes a card's question and answer to its row
+
+        Parameters:
+        card (Card): The card that was edited
+
+        Returns:
+        None
+        """
+        with self.connection:
+            self.connection.execute("UPDATE cards SET question = ?, question_key = ?, answer = ? WHERE row = ?",
+                                    (card.question, card.question.lower(), card.answer, card.row))
+
+    def appendCard(self,card_list):
+        """
+        Adds a new card as the last row
+
+        Parameters:
+        card_list (arr): The card's values in the same order as a deck csv's columns
+
+        Returns:
+        None
+        """
+        with self.connection:
+            self.connection.execute("INSERT INTO cards (question, question_key, answer, date_created, cur_interval, ease_factor, "
+                                    "times_reviewed, times_failed, times_correct, next_due) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                    (card_list[0], card_list[0].lower(), *card_list[1:9]))
+
+    def findRow(self,question):
+        """
+        Looks up a card by its lower cased question using the question index
+
+        Parameters:
+        question (str): The lower cased question to search for
+
+        Returns:
+        int or None: The row of the card, or None if there is no such card
+        """
+        found = self.connection.execute("SELECT row FROM cards WHERE question_key = ? LIMIT 1", (question,)).fetchone()
+        return found[0] if found else None
+
+    def sortedRows(self,attributes,descending=False):
+        """
+        Lists the rows of the deck in order of one or more card attributes using the attributes' indexes
+
+        Parameters:
+        attributes (str or tuple): The card attribute or attributes to sort by ("answer", "question", or "date")
+        descending (bool or tuple): If True sort from highest to lowest, or one value per attribute (Defaults to False)
+
+        Returns:
+        list: The rows of the cards in sorted order
+        """
+        if isinstance(attributes, str):
+            attributes = (attributes,)
+        if isinstance(descending, bool):
+            descending = (descending,) * len(attributes)
+        order = ", ".join(self.columns[attribute] + (" DESC" if reverse else "") for attribute, reverse in zip(attributes, descending))
+        return [line[0] for line in self.connection.execute(f"SELECT row FROM cards ORDER BY {order}, row")]
+
+    def flush(self):
+        self.connection.commit()
+
+class DeckCatalog:
+    fields = ["deck", "size", "mtime", "cards", "due_days", "last_studied"]
+
+    def __init__(self,path,fileName=".catalog"):
+        """
+        A file in the deck directory that keeps the card count, due counts, last studied time, size, and modified time
+        of every deck, so decks can be listed with their stats without loading them. A deck is only read again when
+        its size or modified time has changed
+
+        Parameters:
+        path (str): A string representing the directory where the decks are stored
+        fileName (str): The name of the catalog file (Defaults to ".catalog")
+
+        Returns:
+        None
+        """
+        self.path = path
+        self.file = os.path.join(path, fileName)
+        self.entries = None #deck file name -> entry, read from the catalog file when first needed
+        self.loaded = None #size and modified time of the catalog file when it was last read or written
+
+    def fileStamp(self):
+        try:
+            stat = os.stat(self.file)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def load(self):
+        self.entries = {}
+        self.loaded = self.fileStamp()
+        if self.loaded is None:
+            return
+        with open(self.file, "r", newline="") as f:
+            for line in csv.DictReader(f):
+                try:
+                    self.entries[line["deck"]] = {"size": int(line["size"]), "mtime": float(line["mtime"]),
+                                                  "cards": int(line["cards"]), "last_studied": float(line["last_studied"] or 0),
+                                                  "due_days": {int(day): int(count) for day, _, count in
+                                                               (item.partition(":") for item in line["due_days"].split())}}
+                except (KeyError, TypeError, ValueError):
+                    continue #an unreadable entry is made again from its deck
+
+    def save(self):
+        """
+        Writes the catalog to a temporary file that then replaces the catalog, so it is never left half written
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        with open(self.file + ".tmp", "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(self.fields)
+            for name, entry in sorted(self.entries.items()):
+                due_days = " ".join(f"{day}:{count}" for day, count in sorted(entry["due_days"].items()))
+                w.writerow([name, entry["size"], entry["mtime"], entry["cards"], due_days, entry["last_studied"]])
+        os.replace(self.file + ".tmp", self.file)
+        self.loaded = self.fileStamp()
+
+    def update(self):
+        """
+        Reads the catalog file if it has not been read yet or was written by another deck or process since
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        if self.entries is None or self.fileStamp() != self.loaded:
+            self.load()
+
+    def stamp(self,deckName):
+        """
+        Gets the size and modified time of a deck, counting its review journal as part of the deck
+
+        Parameters:
+        deckName (str): The name of the deck's file
+
+        Returns:
+        tuple: The total size and the latest modified time of the deck's files
+        """
+        size, mtime = 0, 0.0
+        for file in (os.path.join(self.path, deckName), os.path.join(self.path, deckName + ".journal")):
+            try:
+                stat = os.stat(file)
+            except OSError:
+                continue
+            size += stat.st_size
+            mtime = max(mtime, stat.st_mtime)
+        return size, mtime
+
+    def scan(self,deckName):
+        """
+        Reads a deck once to count its cards and how many of them are due on each day
+
+        Parameters:
+        deckName (str): The name of the deck's file
+
+        Returns:
+        dict: The deck's catalog entry
+        """
+        due_times = [card.next_due for card in openDeckStore(self.path, deckName).iterCards()]
+        size, mtime = self.stamp(deckName)
+        return {"size": size, "mtime": mtime, "cards": len(due_times), "due_days": self.dueDays(due_times), "last_studied": 0.0}
+
+    @staticmethod
+    def dueDays(timestamps):
+        """
+        Counts how many cards are due on each day
+
+        Parameters:
+        timestamps (iterable): The next_due timestamp of every card
+
+        Returns:
+        dict: The ordinal of each day to the number of cards due on it
+        """
+        due_days = {}
+        for timestamp in timestamps:
+            day = dt.fromtimestamp(timestamp).toordinal()
+            due_days[day] = due_days.get(day, 0) + 1
+        return due_days
+
+    def refresh(self,deckNames):
+        """
+        Brings the catalog up to date with the decks in the directory, only reading decks that changed since they
+        were last read
+
+        Parameters:
+        deckNames (list): The names of every deck file in the directory
+
+        Returns:
+        dict: The catalog entry of every deck
+        """
+        self.update()
+        changed = False
+        for name in set(self.entries) - set(deckNames): #decks that were removed
+            del self.entries[name]
+            changed = True
+        for name in deckNames:
+            entry = self.entries.get(name)
+            if entry is not None and (entry["size"], entry["mtime"]) == self.stamp(name):
+                continue
+            try:
+                new_entry = self.scan(name)
+            except Exception:
+                continue #a deck that can not be read is listed without stats
+            new_entry["last_studied"] = entry["last_studied"] if entry else 0.0
+            self.entries[name] = new_entry
+            changed = True
+        if changed:
+            self.save()
+        return self.entries
+
+    def markStudied(self,deckName,cards):
+        """
+        Records that a deck was just studied. The entry is made from the loaded cards instead of reading the deck
+        again, so it must be called after the deck's reviews were written
+
+        Parameters:
+        deckName (str): The name of the deck's file
+        cards (arr): Every card of the deck
+
+        Returns:
+        None
+        """
+        self.update()
+        size, mtime = self.stamp(deckName)
+        self.entries[deckName] = {"size": size, "mtime": mtime, "cards": len(cards),
+                                  "due_days": self.dueDays(card.next_due for card in cards), "last_studied": time.time()}
+        self.save()
+
+    def discard(self,deckName):
+        """
+        Forgets a deck's entry, used when the deck's file is replaced by a different deck
+
+        Parameters:
+        deckName (str): The name of the deck's file
+
+        Returns:
+        None
+        """
+        self.update()
+        if self.entries.pop(deckName, None) is not None:
+            self.save()
+
+    @staticmethod
+    def dueToday(entry):
+        today = dt.now().toordinal()
+        return sum(count for day, count in entry["due_days"].items() if day <= today)
+
+class DeckSnapshot:
+    version = 1 #changed whenever the layout of a snapshot changes so old snapshots are not loaded
+
+    def __init__(self,path,deckName):
+        """
+        A pickled copy of a loaded deck's cards and schedule kept next to the deck as <deck>.snapshot, so a large
+        deck can be opened with a single read instead of being parsed again. Cards are kept as plain tuples and the
+        schedule's heap by row, which pickle reads much faster than Card objects
+
+        Parameters:
+        path (str): A string representing the directory where the decks are stored
+        deckName (str): The name of the deck's file
+
+        Returns:
+        None
+        """
+        self.path = path
+        self.deckName = deckName
+        self.file = os.path.join(path, deckName + ".snapshot")
+
+    def fingerprint(self):
+        """
+        Hashes the contents of the deck and its review journal
+
+        Parameters:
+        None
+
+        Returns:
+        str: The hash of the deck's files
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for file in (os.path.join(self.path, self.deckName), os.path.join(self.path, self.deckName + ".journal")):
+            if os.path.exists(file):
+                with open(file, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+        return digest.hexdigest()
+
+    def load(self,stamp):
+        """
+        Loads the snapshot if it was made from the deck as it is now. The size and modified time are checked first,
+        and if only the modified time changed the deck's hash is compared so a touched or copied deck is still loaded
+
+        Parameters:
+        stamp (tuple): The current size and modified time of the deck
+
+        Returns:
+        dict or None: The snapshot's cards and schedule, or None if there is no snapshot or the deck has changed
+        """
+        try:
+            with open(self.file, "rb") as f:
+                data = io.BytesIO(f.read())
+            header = pickle.load(data)
+            if header["version"] != self.version or header["stamp"][0] != stamp[0]:
+                return None
+            if header["stamp"] != stamp and header["hash"] != self.fingerprint():
+                return None
+            state = pickle.load(data)
+        except Exception:
+            return None  #a missing, old, or damaged snapshot is made again from the deck
+        if header["stamp"] != stamp:
+            self.save(stamp, state, header["hash"])
+        return state
+
+    def save(self,stamp,state,fingerprint=None):
+        """
+        Writes the snapshot to a temporary file that then replaces the old snapshot
+
+        Parameters:
+        stamp (tuple): The size and modified time of the deck the state was loaded from
+        state (dict): The deck's cards and schedule, see Deck.snapshotState
+        fingerprint (str): The hash of the deck's files if it is already known (Defaults to hashing them)
+
+        Returns:
+        None
+        """
+        header = {"version": self.version, "stamp": stamp, "hash": fingerprint or self.fingerprint()}
+        try:
+            with open(self.file + ".tmp", "wb") as f:
+                pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(self.file + ".tmp", self.file)
+        except (OSError, pickle.PicklingError, RecursionError):
+            if os.path.exists(self.file + ".tmp"):
+                os.remove(self.file + ".tmp")
+
+    def remove(self):
+        if os.path.exists(self.file):
+            os.remove(self.file)
+
+class DeckCache:
+    #the deck attributes that make up a loaded deck
+    attributes = ("deck", "study_deck", "hash_table", "search_index", "fuzzy_index", "sorted_indexes", "store", "row_index")
+
+    def __init__(self,budget=256 * 1024 * 1024,expansion=8):
+        """
+        A least recently used cache of loaded decks, so going back to a deck that has not changed does not read and
+        index it again. Decks are kept by file and (size, modified time), and the least recently used decks are
+        removed once the estimated memory of all cached decks is over the budget
+
+        Parameters:
+        budget (int): The most memory in bytes the cached decks should use (Defaults to 256 MB)
+        expansion (int): How many times bigger a loaded deck is estimated to be than its file (Defaults to 8)
+
+        Returns:
+        None
+        """
+        self.budget = budget
+        self.expansion = expansion
+        self.entries = OrderedDict() #file -> (stamp, state, weight), least recently used first
+        self.total = 0
+
+    def get(self,file,stamp):
+        """
+        Gets a cached deck if its file has not changed since it was cached
+
+        Parameters:
+        file (str): The path of the deck's file
+        stamp (tuple): The current size and modified time of the deck
+
+        Returns:
+        dict or None: The deck's attributes, or None if the deck is not cached or has changed
+        """
+        entry = self.entries.get(file)
+        if entry is None:
+            return None
+        if entry[0] != stamp:
+            self.discard(file)
+            return None
+        self.entries.move_to_end(file)
+        return entry[1]
+
+    def put(self,file,stamp,state):
+        """
+        Caches a loaded deck, removing the least recently used decks while the cache is over its budget
+
+        Parameters:
+        file (str): The path of the deck's file
+        stamp (tuple): The size and modified time of the deck
+        state (dict): The deck's attributes
+
+        Returns:
+        None
+        """
+        self.discard(file)
+        weight = stamp[0] * self.expansion
+        if weight > self.budget:
+            return  #a deck bigger than the whole budget is not kept
+        self.entries[file] = (stamp, state, weight)
+        self.total += weight
+        while self.total > self.budget:
+            oldest, (_, _, oldest_weight) = self.entries.popitem(last=False)
+            self.total -= oldest_weight
+
+    def discard(self,file):
+        entry = self.entries.pop(file, None)
+        if entry is not None:
+            self.total -= entry[2]
+
+class PriorityQueue:
+    def __init__(self):
+        """
+        An indexed binary heap where every item has exactly one entry, so an item's priority can be changed or the
+        item removed in O(log n) without leaving old entries behind
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.heap = [] #entries of [priority, order, data], order keeps items with the same priority first in first out
+        self.position = {} #data -> index of its entry in the heap
+        self.counter = 0
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def size(self):
+        return len(self.heap)
+
+    def contains(self,data):
+        return data in self.position
+
+    def enqueue(self,priority, data):
+        """
+        Adds an item, or moves it to its new priority if it is already in the queue
+
+        Parameters:
+        priority (float): The priority of the item, lower comes out first
+        data: The item
+
+        Returns:
+        None
+        """
+        self.counter += 1
+        if data in self.position:
+            index = self.position[data]
+            entry = self.heap[index]
+            entry[0] = priority
+            entry[1] = self.counter
+            self.siftUp(index)
+            self.siftDown(self.position[data])
+        else:
+            self.heap.append([priority, self.counter, data])
+            self.position[data] = len(self.heap) - 1
+            self.siftUp(len(self.heap) - 1)
+
+    def dequeue(self):
+        if self.heap:
+            return self.removeAt(0)[2]
+
+    def remove(self,data):
+        """
+        Removes an item from anywhere in the queue
+
+        Parameters:
+        data: The item to remove
+
+        Returns:
+        bool: True if the item was in the queue, and False otherwise
+        """
+        if data not in self.position:
+            return False
+        self.removeAt(self.position[data])
+        return True
+
+    def peek(self):
+        if self.heap:
+            return self.heap[0][2]
+
+    def peekPriority(self):
+        if self.heap:
+            return self.heap[0][0]
+
+    def removeAt(self,index):
+        entry = self.heap[index]
+        last = self.heap.pop()
+        del self.position[entry[2]]
+        if index < len(self.heap):
+            #fill the hole with the last entry and move it to where it belongs
+            self.heap[index] = last
+            self.position[last[2]] = index
+            self.siftUp(index)
+            self.siftDown(self.position[last[2]])
+        return entry
+
+    def siftUp(self,index):
+        entry = self.heap[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if self.heap[parent][:2] <= entry[:2]:
+                break
+            self.heap[index] = self.heap[parent]
+            self.position[self.heap[index][2]] = index
+            index = parent
+        self.heap[index] = entry
+        self.position[entry[2]] = index
+
+    def siftDown(self,index):
+        entry = self.heap[index]
+        size = len(self.heap)
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and self.heap[child + 1][:2] < self.heap[child][:2]:
+                child += 1
+            if entry[:2] <= self.heap[child][:2]:
+                break
+            self.heap[index] = self.heap[child]
+            self.position[self.heap[index][2]] = index
+            index = child
+        self.heap[index] = entry
+        self.position[entry[2]] = index
+
+class Deck:
+    def __init__(self,path):
+        """
+        A basic deck class where the user can make decks, select a deck to use, study the selected deck, edit the selected deck,
+        export selected deck, and import other decks
+
+        Parameters:
+        path (str): A string representing the directory where the decks are stored
+
+        Returns:
+        None
+        """
+        self.path = path
+        self.deck = None
+        self.deckName = None
+        self.study_deck = DeckSchedule(1,"review_time")
+        self.hash_table = None #built the first time a card is looked up by question
+        self.search_index = None #built the first time a keyword search is made
+        self.fuzzy_index = None #built the first time a fuzzy search is made
+        self.sorted_indexes = {} #attribute -> SortedIndex, each built the first time it is used
+        self.store = None
+        self.row_index = {}
+        self.invalidChars = ["\\", "/", ":", "*", "?", '"', "<", ">","|"]  # characters that can not be in a file's name in windows
+        self.study_mode = "review_time"
+        self.card_threshold = 0.6  #default
+        self.fuzzy_distance = 3  #most edits a typo tolerant search allows by default
+        self.catalog = DeckCatalog(path)
+        self.deck_cache = DeckCache()
+        self.loadedDeck = None #the deck file the loaded cards came from
+        self.loadedStamp = None #the deck file's stamp when it was loaded or last written by this deck
+        self.snapshot_min_cards = 5000  #decks with fewer cards load quickly enough without a snapshot
+        self.pending = {} #row -> reviewed card whose new values have not been written yet
+        self.flush_size = 100  #write the pending reviews once this many cards are waiting
+        self.flush_interval = 300  #or once the oldest waiting review is this many seconds old
+        self.pending_since = None
+        self.session_removed = [] #cards removed from the schedule for the current study session only
+
+    def makeDeck(self):
+        """
+        Generates a deck based on the users inputs as a csv file
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        deck = []
+        deck.append(DECK_HEADER)  # header for the csv
+        existingDecks = [os.path.splitext(d)[0] for d in self.listDecks()]
+        while True:
+            deckName = input("Name of the deck:\n")
+
+            if any(char in deckName for char in self.invalidChars):  # if any invalid characters are in the deck name
+                print(f"The name can not contain:")
+                print(*self.invalidChars, sep=",")
+                print("\n")
+
+            elif deckName == "":
+                print("The deck must have a name!")
+
+            elif deckName in existingDecks:  # checks for duplicates
+                print("Duplicate deck name try another name!")
+
+            else:
+                break
+
+        card = self.makeCard()
+        deck.append(card)
+
+        while True:
+            choice = input("Do you want to add more cards?\n1): Yes:\n2): No:\n")
+
+            if choice == "2":
+                break
+            elif choice == "1":
+                card = self.makeCard()
+                deck.append(card)
+            else:
+                print("Invalid Input! Please enter '1' for Yes or '2' for No.")
+
+        with open(os.path.join(self.path, deckName + ".csv"), "w", newline='') as f:
+            w = csv.writer(f)
+            w.writerows(deck)
+
+    def makeCard(self):
+        """
+        Generates a card based on the users inputs and adds it to the deck
+
+        Parameters:
+        deck (arr): array of all cards to store as a csv
+
+        Returns:
+        None
+        """
+        card = []
+        while True:
+            question = str(input("Question for the card:\n"))
+            if question == "":
+                print("The card must have a question!")
+            else:
+                break
+        while True:
+            answer = str(input("Answer for the card:\n"))
+            if answer == "":
+                print("The card must have a answer!")
+            else:
+                break
+        now = str(dt.now().date()) + " " + str(dt.now().time())[:-7]  # gets current date and time
+        card.append(question)
+        card.append(answer)
+
+        cur_interval = 1
+        times_reviewed = 0
+        times_failed = 0
+        times_correct = 0
+        ease_factor = 2.5
+
+        card.append(now)
+        card.append(cur_interval)
+        card.append(ease_factor)
+        card.append(times_reviewed)
+        card.append(times_correct)
+        card.append(times_failed)
+        card.append(now) #new cards are due right away
+
+        return card
+
+    def extractDeck(self):
+        """
+        Extracts all information from the selected deck
+
+        Parameters:
+        None:
+
+        Returns:
+        deck: (arr): An array where the data from a csv is stored
+        """
+        try:
+            self.flushReviews() #pending reviews belong to the deck being left
+            if self.loadedStamp is not None: #keep the deck being left so going back to it is instant
+                self.deck_cache.put(self.loadedDeck, self.loadedStamp,
+                                    {attribute: getattr(self, attribute) for attribute in DeckCache.attributes})
+            self.loadedDeck = None
+            self.loadedStamp = None
+            stamp = self.catalog.stamp(self.deckName)
+            state = self.deck_cache.get(self.deckName, stamp)
+            if state is not None:
+                for attribute, value in state.items():
+                    setattr(self, attribute, value)
+                self.loadedDeck = self.deckName
+                self.loadedStamp = stamp
+                return self.deck
+
+            self.store = openDeckStore(self.path, self.deckName)
+            self.hash_table = None
+            self.search_index = None
+            self.fuzzy_index = None
+            self.sorted_indexes = {}
+            snapshot = DeckSnapshot(self.path, self.deckName)
+            state = snapshot.load(stamp)
+            if state is not None:
+                self.restoreSnapshot(state)
+                self.loadedDeck = self.deckName
+                self.loadedStamp = stamp
+                return self.deck
+
+            self.study_deck = self.study_deck.emptyCopy()
+            deck = []
+            self.row_index = {}
+
+            #build the deck and schedule in one pass over the file
+            for card in self.store.iterCards():
+                deck.append(card)
+                self.row_index[card.row] = card
+                self.study_deck.addCard(card)
+
+            self.deck = deck
+            self.loadedDeck = self.deckName
+            self.loadedStamp = stamp
+            if len(deck) >= self.snapshot_min_cards:
+                snapshot.save(stamp, self.snapshotState())
+            return self.deck
+
+        except:
+            print("An error occurred")
+
+    def markWritten(self):
+        """
+        Records the stamp of the loaded deck's file after the deck wrote to it, so the deck's own changes do not make
+        its cached copy look out of date while a change made by anything else still does
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        if self.loadedDeck is not None and self.loadedStamp is not None:
+            self.loadedStamp = self.catalog.stamp(self.loadedDeck)
+
+    def forgetLoaded(self):
+        """
+        Drops the loaded deck from the deck cache and keeps it from being cached again until it is read from its file,
+        used once the loaded cards have changes that only live in memory
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        if self.loadedDeck is not None:
+            self.deck_cache.discard(self.loadedDeck)
+        self.loadedStamp = None
+
+    def endSession(self):
+        """
+        Puts the cards removed during a study session back in the schedule, since removing a card only lasts for the
+        session, and drops the deck from the deck cache
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        if not self.session_removed:
+            return
+        for card in self.session_removed:
+            self.study_deck.addCard(card)
+        self.session_removed = []
+        self.forgetLoaded()
+
+    def snapshotState(self):
+        """
+        Gets the loaded deck's cards and schedule in the plain form kept in a DeckSnapshot
+
+        Parameters:
+        None
+
+        Returns:
+        dict: The cards as tuples of their attributes and the schedule's heap as (priority, order, row) entries
+        """
+        values = operator.attrgetter(*Card.__slots__)
+        queue = self.study_deck.priority_deck
+        return {"cards": [values(card) for card in self.deck],
+                "heap": [(entry[0], entry[1], entry[2].row) for entry in queue.heap],
+                "counter": queue.counter}
+
+    def restoreSnapshot(self,state):
+        """
+        Rebuilds the deck and its schedule from a DeckSnapshot without sorting anything again, the heap is restored
+        in the order it was saved in
+
+        Parameters:
+        state (dict): The snapshot's cards and schedule, see snapshotState
+
+        Returns:
+        None
+        """
+        deck = []
+        row_index = {}
+        make = Card.__new__
+        for values in state["cards"]:
+            card = make(Card) #the values were already converted when the deck was first read
+            (card.question, card.answer, card.date, card.row, card.cur_interval, card.ease_factor, card.times_reviewed,
+             card.times_failed, card.times_correct, card.next_due) = values
+            deck.append(card)
+            row_index[card.row] = card
+
+        self.study_deck = self.study_deck.emptyCopy()
+        queue = self.study_deck.priority_deck
+        queue.heap = [[priority, order, row_index[row]] for priority, order, row in state["heap"]]
+        queue.position = {entry[2]: index for index, entry in enumerate(queue.heap)}
+        queue.counter = state["counter"]
+
+        self.deck = deck
+        self.row_index = row_index
+
+    def selectDeck(self):
+        """
+        Returns a string of the decks name that the user chose, if valid
+
+        Parameters:
+        None
+
+        Returns:
+        str: A string of the deck name the user chose
+        """
+        existingDecks = self.listDecks()
+        if not existingDecks:
+            print("There are no decks to select!\nYou can make decks at the main menu")
+            return
+
+        else:
+            entries = self.catalog.refresh(existingDecks)
+            while True:
+                print("Select a deck:")
+                for idx, d in enumerate(existingDecks, 1):
+                    name, extension = os.path.splitext(d)
+                    info = ""
+                    if d in entries:
+                        entry = entries[d]
+                        studied = dt.fromtimestamp(entry["last_studied"]).strftime("%Y-%m-%d") if entry["last_studied"] else "never"
+                        info = (f" - {entry['cards']} cards, {DeckCatalog.dueToday(entry)} due today, last studied {studied}, "
+                                f"{entry['size'] / 1024:.1f} KB")
+                    print(f"{idx}): {name}" + (" (SQLite)" if extension == ".db" else "") + info)
+                deck_choice = input("")
+                if deck_choice.isnumeric() and 1 <= int(deck_choice) <= len(existingDecks):
+                    selectedDeck = existingDecks[int(deck_choice) - 1]
+                    self.deckName = selectedDeck
+                    return self.deckName
+                else:
+                    print("\nEnter a existing deck!")
+
+    def listDecks(self):
+        """
+        Lists the files of every deck in the deck directory, both csv and SQLite decks
+
+        Parameters:
+        None
+
+        Returns:
+        list: A list of the deck file names
+        """
+        return listDeckFiles(self.path)
+
+    def migrateDeck(self):
+        """
+        Allows user to move a deck between the csv and SQLite formats
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        cur_name = self.deckName
+        selectedDeck = self.selectDeck()
+        self.deckName = cur_name # resets deck name to original one
+        if not selectedDeck:
+            return
+
+        name, extension = os.path.splitext(selectedDeck)
+        newDeck = name + (".csv" if extension == ".db" else ".db")
+        if os.path.exists(os.path.join(self.path, newDeck)):
+            print(f"'{newDeck}' already exists!")
+            return
+
+        try:
+            migrateDeckStore(self.path, selectedDeck, newDeck)
+            print(f"Deck converted to {'SQLite' if newDeck.endswith('.db') else 'csv'}")
+            self.deck_cache.discard(selectedDeck) #the old file is gone
+            DeckSnapshot(self.path, selectedDeck).remove()
+            if self.loadedDeck == selectedDeck:
+                self.loadedDeck = None
+            if self.deckName == selectedDeck:
+                self.deckName = newDeck
+                self.extractDeck()
+
+        except Exception as e:
+            print(e)
+
+    def importDeck(self):
+        """
+        Allows user to import a deck, if valid
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        deckImport = input("Enter the path to the deck you want to import, or a directory or pattern to import many decks:\n")
+        self.flushReviews() #an import can replace the loaded deck, its reviews belong to the old file
+        if os.path.isdir(deckImport) or glob.has_magic(deckImport):
+            try:
+                for report in self.importDecks(deckImport):
+                    if report["imported"]:
+                        self.deckReplaced(os.path.basename(report["file"]))
+                        print(f"{report['file']}: imported {report['rows']} cards")
+                    else:
+                        print(f"{report['file']}: not imported, {report['error_count']} errors")
+                        for line, error in report["errors"]:
+                            print(f"    line {line}: {error}")
+            except Exception as e:
+                print(e)
+            return
+        try:
+            if not os.path.exists(deckImport):
+                print("File not found")
+                return
+
+            filename = os.path.basename(deckImport)
+            destinationPath = os.path.join(self.path, filename)
+            report = importDeckFile(deckImport, destinationPath)
+            if not report["imported"] and report["rows"]:
+                print(f"The deck has {report['error_count']} invalid rows:")
+                for line, error in report["errors"]:
+                    print(f"    line {line}: {error}")
+                print("1): Skip invalid rows"
+                      "\n2): Repair invalid rows"
+                      "\n3): Cancel"
+                      )
+                choice = input("Select an option:")
+                if choice in ("1", "2"):
+                    report = importDeckFile(deckImport, destinationPath, "skip" if choice == "1" else "repair")
+                else:
+                    return
+            if report["imported"]:
+                self.deckReplaced(filename)
+                print(f"Deck imported successfully, {report['skipped']} rows skipped and {report['repaired']} rows repaired")
+            else:
+                print("Invalid file!")
+
+        except Exception as e:
+            print(e)
+
+    def deckReplaced(self,deckName):
+        """
+        Forgets everything kept about a deck whose file was just written by an import, and reads the deck again if
+        it is the loaded one so the old cards are not used with the new file
+
+        Parameters:
+        deckName (str): The name of the deck's file
+
+        Returns:
+        None
+        """
+        self.deck_cache.discard(deckName)
+        self.catalog.discard(deckName)
+        if deckName == self.loadedDeck:
+            self.forgetLoaded()
+            self.deckName = deckName
+            self.extractDeck()
+
+    def importDecks(self,source,mode="strict",workers=None):
+        """
+        Imports every deck csv in a directory or matching a pattern. Each file is checked row by row and copied in a
+        pool of worker processes
+
+        Parameters:
+        source (str): A directory of deck csv files, or a pattern such as "decks/*.csv"
+        mode (str): What to do with invalid rows, "strict", "skip", or "repair", see importDeckFile (Defaults to "strict")
+        workers (int): The number of worker processes (Defaults to the number of CPUs)
+
+        Returns:
+        list: A report for every file, see importDeckFile
+        """
+        pattern = os.path.join(source, "*.csv") if os.path.isdir(source) else source
+        files = sorted(file for file in glob.glob(pattern) if os.path.isfile(file))
+        #files with the same name would be written to the same deck, so none of them is imported
+        names = Counter(os.path.basename(file) for file in files)
+        reports = {file: {"file": file, "rows": 0, "error_count": 1, "skipped": 0, "repaired": 0, "imported": False,
+                          "errors": [(0, f"another file being imported is also named {os.path.basename(file)}")]}
+                   for file in files if names[os.path.basename(file)] > 1}
+        unique = [file for file in files if file not in reports]
+        if unique:
+            destinations = [os.path.join(self.path, os.path.basename(file)) for file in unique]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                #larger chunks keep the overhead of sending work to the processes down when there are many small decks
+                for report in pool.map(importDeckFile, unique, destinations, [mode] * len(unique), chunksize=max(1, len(unique) // 32)):
+                    reports[report["file"]] = report
+        return [reports[file] for file in files]
+
+    def exportDeck(self):
+        """
+        Allows user to export existing decks, if valid
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        cur_name = self.deckName
+        selectedDeck = self.selectDeck()
+        self.deckName = cur_name # resets deck name to original one
+
+        try:
+            deckExport = input("Enter the path to the deck you want to export to:\n")
+            if not os.path.isdir(deckExport):
+                print(f"'{deckExport}' is not a valid directory.")
+                return
+
+            #fold reviews that are still waiting or in the journal into the deck's file so the copy has them
+            if selectedDeck == self.loadedDeck:
+                self.flushReviews()
+                self.store.flush()
+                self.markWritten()
+            else:
+                openDeckStore(self.path, selectedDeck).flush()
+
+            shutil.copy(os.path.join(self.path, selectedDeck), deckExport) #create a copy of the deck
+            print("Successful")
+
+        except Exception as e:
+            print(e)
+
+    def studyDeck(self):
+        """
+        A function where the user could study cards from the selected deck. The frequency of cards appearing is based on their review time
+        If a custom study mode is active then a custom study mode is selected.
+
+        Parameters:
+        None
+
+        Returns:
+        None
         """
 
         if self.study_mode != "review_time":
@@ -411,62 +2044,229 @@ class Deck:
                 return
 
             deck_copy = self.study_deck
+            if deck_copy.dueCount() == 0:
+                print("There are no cards due right now!")
+                self.printDueForecast()
+                return
 
-            while not deck_copy.priority_deck.isEmpty():
+            #only the cards that are due are studied, a card answered with Again is due again right away
+            while not deck_copy.priority_deck.isEmpty() and deck_copy.priority_deck.peekPriority() <= time.time():
                 card_to_review = deck_copy.getNextCard()
-                if card_to_review:
-                    print("Question:")
-                    print(card_to_review.question)
-                    input("\nPress enter to see the answer")
-                    print("\nAnswer:")
-                    print(card_to_review.answer, "\n")
-                    card_to_review.cur_interval = card_to_review.ease_factor*self.study_deck.interval_modify
-                    new_interval = card_to_review.cur_interval * card_to_review.ease_factor * self.study_deck.interval_modify
-
-                    while True:
-                        choice = input("1): Again, 2): Hard, 3): Good, 4): Easy, 5): Remove Card, or 6): Exit\n")
-                        if choice == '1':
-                            card_to_review.times_reviewed += 1
-                            card_to_review.times_failed += 1
-                            deck_copy.removeCard()
-                            card_to_review.editCardValues(self.path,self.deckName,card_to_review.ease_factor,card_to_review.ease_factor)
-                            deck_copy.updateReviewTime(card_to_review,card_to_review.ease_factor)
-                            break
+                if card_to_review and not self.reviewCard(card_to_review):
+                    break
 
-                        elif choice == '2':
-                            card_to_review.times_reviewed += 1
-                            card_to_review.times_failed += 1
-                            deck_copy.removeCard()
-                            card_to_review.editCardValues(self.path, self.deckName, card_to_review.ease_factor,card_to_review.cur_interval*self.study_deck.interval_modify*1.2)
-                            deck_copy.updateReviewTime(card_to_review,card_to_review.cur_interval*self.study_deck.interval_modify*1.2)
-                            break
+            self.endSession()
+            self.flushReviews()
+            self.store.flush()
+            self.markWritten()
+            self.catalog.markStudied(self.deckName, self.deck)
 
-                        elif choice == '3':
-                            card_to_review.times_reviewed += 1
-                            card_to_review.times_correct += 1
-                            deck_copy.removeCard()
-                            card_to_review.editCardValues(self.path, self.deckName, card_to_review.ease_factor,new_interval)
-                            deck_copy.updateReviewTime(card_to_review,new_interval)
-                            break
+    def reviewCard(self,card_to_review):
+        """
+        Shows a card to the user and applies their answer to the card's schedule
 
-                        elif choice == "4":
-                            card_to_review.times_reviewed += 1
-                            card_to_review.times_correct += 1
-                            deck_copy.removeCard()
-                            card_to_review.editCardValues(self.path, self.deckName, card_to_review.ease_factor + 1.5,new_interval)
-                            deck_copy.updateReviewTime(card_to_review,new_interval)
-                            break
+        Parameters:
+        card_to_review (Card): The card to show
+
+        Returns:
+        bool: False if the user chose to exit, and True otherwise
+        """
+        print("Question:")
+        print(card_to_review.question)
+        input("\nPress enter to see the answer")
+        print("\nAnswer:")
+        print(card_to_review.answer, "\n")
+
+        while True:
+            choice = input("1): Again, 2): Hard, 3): Good, 4): Easy, 5): Remove Card, or 6): Exit\n")
+            if choice in ("1", "2", "3", "4"):
+                self.study_deck.gradeCard(card_to_review, int(choice))
+                self.logReview(card_to_review)
+                return True
+
+            elif choice == "5":
+                self.study_deck.removeCard(card_to_review) #only leaves this session, put back by endSession
+                self.session_removed.append(card_to_review)
+                return True
+
+            elif choice == "6":
+                self.flushReviews()
+                return False
+
+            else:
+                print("Invalid Input!")
+
+    def studyMultipleDecks(self):
+        """
+        A function where the user picks several decks and studies the due cards of all of them in one session
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        existingDecks = self.listDecks()
+        if not existingDecks:
+            print("There are no decks to select!\nYou can make decks at the main menu")
+            return
+
+        while True:
+            print("Select decks to study, separated by commas, or 'all':")
+            for idx, d in enumerate(existingDecks, 1):
+                name, extension = os.path.splitext(d)
+                print(f"{idx}): {name}" + (" (SQLite)" if extension == ".db" else ""))
+            deck_choice = input("")
+            if deck_choice.strip().lower() == "all":
+                selectedDecks = existingDecks
+                break
+            choices = [choice.strip() for choice in deck_choice.split(",")]
+            if choices and all(choice.isnumeric() and 1 <= int(choice) <= len(existingDecks) for choice in choices):
+                selectedDecks = [existingDecks[int(choice) - 1] for choice in dict.fromkeys(choices)]
+                break
+            print("\nEnter existing decks!")
+
+        session = MultiDeckSession(self.path, selectedDecks, self)
+        session.study()
+
+    def logReview(self,card):
+        """
+        Marks a card's new review values to be saved. Reviews wait in memory, where answering the same card again
+        only keeps its latest values, and are written together by flushReviews once enough cards are waiting or the
+        oldest has waited long enough
+
+        Parameters:
+        card (Card): The card that was reviewed
+
+        Returns:
+        None
+        """
+        if not self.pending:
+            self.pending_since = time.time()
+            pending_decks.add(self)
+        self.pending[card.row] = card
+        if len(self.pending) >= self.flush_size or self.reviewsStale():
+            self.flushReviews()
+
+    def reviewsStale(self,now=None):
+        """
+        Checks if the oldest waiting review has waited for flush_interval seconds, so a deck that stops being
+        answered can still have its reviews written by a timer
+
+        Parameters:
+        now (float): The current time in seconds since the epoch (Defaults to the time now)
+
+        Returns:
+        bool: True if there are waiting reviews and the oldest has waited long enough, and False otherwise
+        """
+        if not self.pending:
+            return False
+        return (time.time() if now is None else now) - self.pending_since >= self.flush_interval
+
+    def flushReviews(self):
+        """
+        Writes every waiting review to the deck's store in one write, a csv deck appends them to its review journal
+        and a SQLite deck updates them in one transaction
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        if not self.pending:
+            return
+        self.store.updateMany(self.pending.values())
+        self.markWritten()
+        self.pending = {}
+        self.pending_since = None
+        pending_decks.discard(self)
+
+    def ingestReviews(self,file):
+        """
+        Applies review results recorded somewhere else to the selected deck. The file is read one line at a time,
+        the reviews are graded oldest first with the same rules as studyDeck, then the deck is written once at the end
+
+        Each line of the file is question,grade,time where grade is 1-4 or Again, Hard, Good, or Easy and time is
+        written as "YYYY-MM-DD HH:MM:SS". Files merged from several devices are not in time order, so the reviews are
+        sorted by time first, reviews made at the same time are applied in the order they are in the file
+
+        Parameters:
+        file (str): The path to the file of review results
+
+        Returns:
+        tuple: The number of reviews applied, the number of questions not in the deck, and the number of unreadable lines
+        """
+        grades = {"again": 1, "hard": 2, "good": 3, "easy": 4}
+        reviews = [] #(time, card, grade) of every review that can be applied
+        applied = missing = invalid = 0
+        with open(file, "r", newline="") as f:
+            for line in csv.reader(f):
+                if len(line) != 3:
+                    invalid += 1
+                    continue
+                question, grade, when = line
+                grade = grades.get(grade.strip().lower(), grade.strip())
+                now = parseTimestamp(when.strip())
+                if grade not in (1, 2, 3, 4, "1", "2", "3", "4") or not now:
+                    invalid += 1 #also skips a header line
+                    continue
+                card = self.findCard(question)
+                if card is None:
+                    missing += 1
+                    continue
+                reviews.append((now, card, int(grade)))
+
+        reviewed = {} #row -> card, each card is written once however many times it was reviewed
+        reviews.sort(key=operator.itemgetter(0)) #a stable sort, so a card's reviews at the same time keep their order
+        for now, card, grade in reviews:
+            self.study_deck.gradeCard(card, grade, now)
+            reviewed[card.row] = card
+            applied += 1
+        if reviewed:
+            self.store.updateMany(reviewed.values())
+            self.markWritten()
+        return applied, missing, invalid
+
+    def importReviews(self):
+        """
+        Asks for a file of review results and applies it to the selected deck
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        if not self.deck:
+            print("You need to select a deck first!")
+            return
+        file = input("Enter the path to the review results file:\n")
+        if not os.path.isfile(file):
+            print("File not found")
+            return
+        try:
+            applied, missing, invalid = self.ingestReviews(file)
+        except Exception as e:
+            print(e)
+            return
+        print(f"Applied {applied} reviews, {missing} questions were not in the deck, and {invalid} lines could not be read")
 
-                        elif choice == "5":
-                            card_to_review.editCardValues(self.path, self.deckName, card_to_review.ease_factor,new_interval)
-                            deck_copy.removeCard()
-                            break
+    def printDueForecast(self,days=7):
+        """
+        Prints how many cards of the selected deck are due on each of the next few days
 
-                        elif choice == "6":
-                            return
+        Parameters:
+        days (int): The number of days to show (Defaults to 7)
 
-                        else:
-                            print("Invalid Input!")
+        Returns:
+        None
+        """
+        counts = self.study_deck.dueForecast(days)
+        today = dt.now().date()
+        print("Cards due:")
+        for day, count in enumerate(counts):
+            print(f"{'Today' if day == 0 else today.fromordinal(today.toordinal() + day)}): {count}")
 
     def editDeck(self):
         """
@@ -508,45 +2308,56 @@ class Deck:
                         card_index = int(card_index) - 1
                         card = self.deck[card_index] #get the selected card
 
-                        #removes from hash table and add the new one
-                        self.hash_table.delete(card.question.lower())
-                        card.askCard(self.path, self.deckName)
-                        self.hash_table.insert(card.question.lower(), card)
+                        #removes from the indexes and add the new one
+                        self.unindexCard(card)
+                        card.askCard(self.store)
+                        self.markWritten()
+                        self.indexCard(card)
                     else:
                         print("Invalid input!")
 
             elif choice == "2":
                 while True:
+                    #Back keeps the number it always had, newer options come after it
                     print("Sort by what?"
                           "\n1): Answer alphabetically"
                           "\n2): Question alphabetically"
                           "\n3): Last Created"
                           "\n4): Back"
+                          "\n5): Newest Created"
                           )
                     edit = input("Select an option:")
                     if edit == "4":
                         break
                     #sorts based on input
                     elif edit == "1":
-                        self.deck = quickSort(self.deck, 0, len(self.deck) - 1, "answer")
+                        self.sortDeck("answer")
                         print("Deck sorted by answer.")
                         break
                     elif edit == "2":
-                        self.deck = quickSort(self.deck, 0, len(self.deck) - 1, "question")
+                        self.sortDeck("question")
                         print("Deck sorted by question.")
                         break
                     elif edit == "3":
-                        self.deck = quickSort(self.deck, 0, len(self.deck) - 1, "date")
+                        self.sortDeck("date")
                         print("Deck sorted by date.")
                         break
+                    elif edit == "5":
+                        self.sortDeck("date", descending=True)
+                        print("Deck sorted by newest date.")
+                        break
                     else:
                         print("Invalid Input!")
 
             elif choice == "3":
                 while True:
+                    #Back keeps the number it always had, newer options come after it
                     print("Search by what?"
                           "\n1): Question"
                           "\n2): Back"
+                          "\n3): Keywords"
+                          "\n4): Question (typo tolerant)"
+                          "\n5): Date Created"
                           )
                     edit = input("Select an option:")
                     if edit == "2":
@@ -555,44 +2366,47 @@ class Deck:
 
                     elif edit == "1":
                         question = input("Enter question to search for:")
-                        found_card = self.hash_table.get(question.lower())
-                        if found_card:
-                            card = found_card[1]
-                            while True:
-                                print(f"\nFound, edit the card?"
-                                      f"Card): Question):{card.question} Answer): {card.answer} Date Created): {card.date}"
-                                      "\n1): Yes"
-                                      "\n2): No")
-                                search_card_edit = input("Select an option:")
-                                if search_card_edit == "1":
-                                    #removes from hash table and add the new one
-                                    self.hash_table.delete(card.question.lower())
-                                    card.editCard(self.path, self.deckName)
-                                    self.hash_table.insert(card.question.lower(),card)
-                                elif search_card_edit == "2":
-                                    break
-                                else:
-                                    print("Invalid Input!")
+                        card = self.findCard(question)
+                        if card:
+                            self.offerEdit(card)
                         else:
                             print("Card not found")
 
+                    elif edit == "3":
+                        query = input("Enter keywords to search for:")
+                        found_cards = self.searchCards(query)
+                        self.pickFoundCard(found_cards)
+
+                    elif edit == "4":
+                        question = input("Enter question to search for:")
+                        found_cards = self.fuzzySearch(question)
+                        self.pickFoundCard(found_cards)
+
+                    elif edit == "5":
+                        try:
+                            start = dt.fromisoformat(input("Enter the first date (YYYY-MM-DD):"))
+                            end = dt.fromisoformat(input("Enter the last date (YYYY-MM-DD):"))
+                        except ValueError:
+                            print("Invalid date!")
+                            continue
+                        #the last date is included, so stop at the start of the day after it
+                        found_cards = self.rangeCards("date", start, dt.fromordinal(end.toordinal() + 1))
+                        self.pickFoundCard(found_cards)
+
                     else:
                         print("Invalid Input!")
 
             elif choice == "4":
-                if len(self.deck) > 101:
-                    print("You reached the max amount of cards in a deck.\nA deck cannot have more than 100 cards!")
-                    return
                 card_list = self.makeCard()
-                card = Card(card_list[0], card_list[1], card_list[2], len(self.deck)+1, card_list[3], float(card_list[4]), int(card_list[5]), int(card_list[6]),int(card_list[7]))
+                card = Card(card_list[0], card_list[1], card_list[2], len(self.deck)+1, card_list[3], float(card_list[4]), int(card_list[5]), int(card_list[6]),int(card_list[7]),parseTimestamp(card_list[8]))
 
                 #adds it to all decks
                 self.deck.append(card)
+                self.row_index[card.row] = card
                 self.study_deck.addCard(card)
-                self.hash_table.insert(card.question.lower(),card)
-                with open(self.path + "\\" + self.deckName, "a", newline='') as f:
-                    w = csv.writer(f)
-                    w.writerow(card_list)
+                self.indexCard(card)
+                self.store.appendCard(card_list)
+                self.markWritten()
                 print("Card added")
 
             elif choice == "5":
@@ -602,6 +2416,250 @@ class Deck:
             else:
                 print("Invalid input!")
 
+    def sortDeck(self,attributes,descending=False):
+        """
+        Sorts the selected deck by one or more card attributes. A single attribute, which is every sort in the edit
+        menu, is read straight from its sorted index in O(n). Sorting by several attributes uses the indexes of a
+        SQLite deck, or sorts a csv deck by each attribute's key
+
+        Parameters:
+        attributes (str or tuple): The card attribute or attributes to sort by ("answer", "question", or "date")
+        descending (bool or tuple): If True sort from highest to lowest, or one value per attribute (Defaults to False)
+
+        Returns:
+        None
+        """
+        if isinstance(attributes, str):
+            attributes = (attributes,)
+        if isinstance(descending, bool):
+            descending = (descending,) * len(attributes)
+
+        if len(attributes) == 1:
+            rows = list(self.sortedIndex(attributes[0]))
+            if descending[0]:
+                rows.reverse()
+        else:
+            rows = self.store.sortedRows(attributes, descending)
+        if rows is None:
+            rows = list(self.row_index)
+            #python's sort is stable, so sorting by the last attribute first gives a multi key sort
+            for attribute, reverse in reversed(list(zip(attributes, descending))):
+                key = sortKey(attribute)
+                rows.sort(key=lambda row: key(self.row_index[row]), reverse=reverse)
+        self.deck = [self.row_index[row] for row in rows]
+
+    def findCard(self,question):
+        """
+        Finds a card in the selected deck by its question, ignoring case
+
+        Parameters:
+        question (str): The question to search for
+
+        Returns:
+        Card or None: The card with that question, or None if there is no such card
+        """
+        row = self.store.findRow(question.lower())
+        if row is not None:
+            return self.row_index.get(row)
+        found_card = self.lookupTable().get(question.lower())
+        if found_card:
+            return found_card[1]
+
+    def offerEdit(self,card):
+        """
+        Shows a found card and asks the user if they want to edit it
+
+        Parameters:
+        card (Card): The card that was found
+
+        Returns:
+        None
+        """
+        while True:
+            print(f"\nFound, edit the card?"
+                  f"Card): Question):{card.question} Answer): {card.answer} Date Created): {card.date}"
+                  "\n1): Yes"
+                  "\n2): No")
+            search_card_edit = input("Select an option:")
+            if search_card_edit == "1":
+                #removes from the indexes and add the new one
+                self.unindexCard(card)
+                card.editCard(self.store)
+                self.markWritten()
+                self.indexCard(card)
+            elif search_card_edit == "2":
+                break
+            else:
+                print("Invalid Input!")
+
+    def pickFoundCard(self,found_cards):
+        """
+        Lists the cards a search found and lets the user pick one to edit
+
+        Parameters:
+        found_cards (arr): The cards the search found
+
+        Returns:
+        None
+        """
+        if not found_cards:
+            print("Card not found")
+            return
+        while True:
+            printCards(found_cards)
+            card_index = input("Select a card to edit:")
+            if card_index.isnumeric() and int(card_index) == len(found_cards) + 1:
+                break
+            elif card_index.isnumeric() and 0 <= int(card_index) - 1 < len(found_cards):
+                self.offerEdit(found_cards[int(card_index) - 1])
+            else:
+                print("Invalid input!")
+
+    def fuzzySearch(self,question,limit=5,max_distance=None):
+        """
+        Finds the cards whose questions are the fewest edits away from the given question, ignoring case
+
+        Parameters:
+        question (str): The question to search for
+        limit (int): The most cards to return (Defaults to 5)
+        max_distance (int): The largest edit distance a match can have (Defaults to fuzzy_distance)
+
+        Returns:
+        list: The closest cards, closest first
+        """
+        if max_distance is None:
+            max_distance = self.fuzzy_distance
+        if self.fuzzy_index is None:
+            self.fuzzy_index = TrigramIndex(self.deck)
+        return [card for dist, card in self.fuzzy_index.search(question.lower(), limit, max_distance)]
+
+    def searchCards(self,query,limit=None):
+        """
+        Finds the cards whose question or answer contain every word of a query, words also match as prefixes
+
+        Parameters:
+        query (str): The words to search for
+        limit (int): The most cards to return, or None for every match (Defaults to None)
+
+        Returns:
+        list: The matching cards, best match first
+        """
+        found_cards = self.keywordIndex().search(query)
+        return found_cards if limit is None else found_cards[:limit]
+
+    def indexCard(self,card):
+        """
+        Adds a card to the deck's lookup and search indexes
+
+        Parameters:
+        card (Card): The card to add
+
+        Returns:
+        None
+        """
+        if self.hash_table is not None:
+            self.hash_table.insert(card.question.lower(), card)
+        if self.search_index is not None:
+            self.search_index.update(card)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.update(card)
+        for attribute, index in self.sorted_indexes.items():
+            index.add(sortKey(attribute)(card), card.row)
+
+    def unindexCard(self,card):
+        """
+        Removes a card from the deck's lookup and search indexes, called before the card is edited
+
+        Parameters:
+        card (Card): The card to remove
+
+        Returns:
+        None
+        """
+        if self.hash_table is not None:
+            self.hash_table.delete(card.question.lower())
+        if self.search_index is not None:
+            self.search_index.remove(card)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.remove(card)
+        for attribute, index in self.sorted_indexes.items():
+            index.remove(sortKey(attribute)(card), card.row)
+
+    def lookupTable(self):
+        """
+        Gets the hash table of the deck's cards by lower cased question, building it the first time it is asked for
+
+        Parameters:
+        None
+
+        Returns:
+        HashTable: The table of the deck's cards
+        """
+        if self.hash_table is None:
+            self.hash_table = HashTable(len(self.deck) * 2 + 101) #sized so it does not grow while it is filled
+            for card in self.deck:
+                self.hash_table.insert(card.question.lower(), card)
+        return self.hash_table
+
+    def keywordIndex(self):
+        """
+        Gets the keyword search index of the deck, building it the first time it is asked for
+
+        Parameters:
+        None
+
+        Returns:
+        InvertedIndex: The index over the questions and answers of the deck
+        """
+        if self.search_index is None:
+            self.search_index = InvertedIndex(self.deck)
+        return self.search_index
+
+    def sortedIndex(self,attribute):
+        """
+        Gets the sorted index of a card attribute, building it the first time it is asked for
+
+        Parameters:
+        attribute (str): The card attribute of the index ("answer", "question", or "date")
+
+        Returns:
+        SortedIndex: The index of (key, row) entries for the attribute
+        """
+        if attribute not in self.sorted_indexes:
+            key = sortKey(attribute)
+            self.sorted_indexes[attribute] = SortedIndex((key(card), card.row) for card in self.row_index.values())
+        return self.sorted_indexes[attribute]
+
+    def rangeCards(self,attribute,low=None,high=None):
+        """
+        Finds the cards whose attribute is in a range using the attribute's sorted index
+
+        Parameters:
+        attribute (str): The card attribute to check ("answer", "question", or "date")
+        low (any): The lowest value to include, a datetime for "date", or None for no lower limit (Defaults to None)
+        high (any): The value to stop before, or None for no upper limit (Defaults to None)
+
+        Returns:
+        list: The cards in the range, in order of the attribute
+        """
+        return [self.row_index[row] for row in self.sortedIndex(attribute).irange(low, high)]
+
+    def pageCards(self,attribute,page,page_size=20,descending=False):
+        """
+        Gets one page of the deck in order of an attribute without sorting the deck
+
+        Parameters:
+        attribute (str): The card attribute to order by ("answer", "question", or "date")
+        page (int): The page to get, starting at 0
+        page_size (int): The number of cards on a page (Defaults to 20)
+        descending (bool): If True order from the highest value (Defaults to False)
+
+        Returns:
+        list: The cards on the page
+        """
+        rows = self.sortedIndex(attribute).page(page * page_size, page_size, descending)
+        return [self.row_index[row] for row in rows]
+
     def setStudyMode(self):
         """
         A function where the user can set the study mode based on hard or easy cards.
@@ -648,90 +2706,293 @@ class Deck:
         Returns:
         None
         """
-        if not self.deck:
-            print("You need to select a deck first!")
+        if not self.deck:
+            print("You need to select a deck first!")
+            return
+
+        #the review counts below are only changed in memory, so the deck is read from its file when selected again
+        self.forgetLoaded()
+
+        #Create data structures, every card is connected to every other card so the graph's edges are implicit
+        study_graph = ImplicitGraph(self.study_mode)
+        deck = DeckSchedule(1,self.study_mode)
+
+        #populate data structures if a cards meets a threshold, the values of the whole deck are worked out in one batch
+        cards, values = CardBatch(self.deck).thresholdCards(self.study_mode, self.card_threshold)  # will apply to both easy and hard
+        for card, card_study_value in zip(cards, values):
+            study_graph.addVertex(card, card_study_value)
+
+        visited = set()
+        card_to_review = None
+
+        while not study_graph.isEmpty():
+            card_to_review = deck.getNextCard(self.study_mode,card_to_review,study_graph,visited)
+            if card_to_review is None:
+                break
+            if card_to_review:
+                print("Question:")
+                print(card_to_review.question)
+                input("\nPress enter to see the answer")
+                print("\nAnswer:")
+                print(card_to_review.answer, "\n")
+
+                while True:
+                    choice = input("1): Again, 2): Hard, 3): Good, 4): Easy, 5): Remove Card, or 6): Exit")
+
+                    if choice == '1':
+                        card_to_review.times_failed += 1
+                        card_to_review.times_reviewed += 1
+                        study_graph.updateVertex(card_to_review)
+                        break
+
+                    elif choice == '2':
+                        card_to_review.times_failed += 1
+                        card_to_review.times_reviewed += 1
+                        study_graph.updateVertex(card_to_review)
+                        break
+
+                    elif choice == '3':
+                        card_to_review.times_correct += 1
+                        card_to_review.times_reviewed += 1
+                        card_study_value = getattr(card_to_review, self.study_mode)
+                        if card_study_value < self.card_threshold:
+                            study_graph.removeVertex(card_to_review)
+                            visited.add(card_to_review)
+                            break
+                        study_graph.updateVertex(card_to_review)
+                        break
+
+                    elif choice == "4":
+                        card_to_review.times_correct += 1
+                        card_to_review.times_reviewed += 1
+                        card_study_value = getattr(card_to_review, self.study_mode)
+                        if card_study_value < self.card_threshold:
+                            study_graph.removeVertex(card_to_review)
+                            visited.add(card_to_review)
+                            break
+                        study_graph.updateVertex(card_to_review)
+                        break
+
+                    elif choice == "5":
+                        study_graph.removeVertex(card_to_review)
+                        visited.add(card_to_review)
+                        break
+
+                    elif choice == "6":
+                        return
+
+                    else:
+                        print("Invalid Input!")
+
+class CardBatch:
+    def __init__(self,cards):
+        """
+        Holds the review stats of many cards as columns so difficulty scores, threshold checks and next intervals
+        are worked out for the whole batch in one call. The columns are NumPy arrays when NumPy is installed and
+        plain lists otherwise, and each column is only read from the cards the first time it is used
+
+        Parameters:
+        cards (arr): The cards in the batch
+
+        Returns:
+        None
+        """
+        self.cards = cards
+        self.columns = {} #card attribute -> its value for every card
+
+    def column(self,attribute):
+        """
+        Gets the values of a card attribute for every card in the batch
+
+        Parameters:
+        attribute (str): "times_reviewed", "times_failed", "times_correct", "ease_factor", or "cur_interval"
+
+        Returns:
+        arr: The value of each card, in the same order as the cards
+        """
+        if attribute not in self.columns:
+            values = map(operator.attrgetter(attribute), self.cards)
+            if np is not None:
+                self.columns[attribute] = np.fromiter(values, dtype=float, count=len(self.cards))
+            else:
+                self.columns[attribute] = list(values)
+        return self.columns[attribute]
+
+    def difficulty(self,mode):
+        """
+        Calculates the study_hard or study_easy value of every card in the batch
+
+        Parameters:
+        mode (str): "study_hard" or "study_easy"
+
+        Returns:
+        arr: The value of each card, in the same order as the cards
+        """
+        counts = self.column("times_failed" if mode == "study_hard" else "times_correct")
+        reviewed = self.column("times_reviewed")
+        if np is not None:
+            return (counts + 1) / (reviewed + 1)
+        return [(count + 1) / (times + 1) for count, times in zip(counts, reviewed)]
+
+    def thresholdMask(self,mode,threshold):
+        """
+        Checks which cards in the batch meet a study mode's card_threshold
+
+        Parameters:
+        mode (str): "study_hard" or "study_easy"
+        threshold (float): The lowest value a card can have to be studied
+
+        Returns:
+        arr: True for each card that meets the threshold, and False otherwise
+        """
+        scores = self.difficulty(mode)
+        if np is not None:
+            return scores >= threshold
+        return [score >= threshold for score in scores]
+
+    def thresholdCards(self,mode,threshold):
+        """
+        Finds the cards in the batch that meet a study mode's card_threshold, without looping over the cards that
+        do not when NumPy is installed
+
+        Parameters:
+        mode (str): "study_hard" or "study_easy"
+        threshold (float): The lowest value a card can have to be studied
+
+        Returns:
+        list: The cards that meet the threshold, in the same order as the cards
+        list: The value of each of those cards
+        """
+        scores = self.difficulty(mode)
+        if np is not None:
+            selected = np.flatnonzero(scores >= threshold)
+            return [self.cards[index] for index in selected.tolist()], scores[selected].tolist()
+        selected = [index for index, score in enumerate(scores) if score >= threshold]
+        return [self.cards[index] for index in selected], [scores[index] for index in selected]
+
+    def nextIntervals(self,grade,interval_modify=1,hard_multiplier=1.2):
+        """
+        Calculates the interval every card in the batch would get if it was answered with a grade, using the
+        same rules as DeckSchedule.gradeCard
+
+        Parameters:
+        grade (int): 1 for Again, 2 for Hard, 3 for Good, or 4 for Easy
+        interval_modify (float): The interval modifier of the deck's schedule (Defaults to 1)
+        hard_multiplier (float): The schedule's multiplier for an answer of Hard (Defaults to 1.2)
+
+        Returns:
+        arr: The next interval of each card in days
+        """
+        schedule = DeckSchedule(interval_modify, "review_time", hard_multiplier)
+        ease_factor = self.column("ease_factor")
+        if np is not None:
+            return np.array(schedule.nextInterval(ease_factor, grade), dtype=float)
+        return [schedule.nextInterval(ease, grade) for ease in ease_factor]
+
+class MultiDeckSession:
+    def __init__(self,path,deckNames,loaded=None):
+        """
+        A study session over several decks at once. Every deck keeps its own DeckSchedule and the next card is
+        picked with a k-way merge of the schedules, so reviews are written back to the deck the card came from
+
+        Parameters:
+        path (str): A string representing the directory where the decks are stored
+        deckNames (arr): The file names of the decks to study
+        loaded (Deck): A deck that is already loaded, used instead of loading its file again so its cards and
+        schedule stay up to date with the session (Defaults to None)
+
+        Returns:
+        None
+        """
+        self.decks = []
+        for deckName in deckNames:
+            if loaded is not None and loaded.loadedDeck == deckName:
+                self.decks.append(loaded)
+                continue
+            deck = Deck(path)
+            deck.deckName = deckName
+            if deck.extractDeck() is not None:
+                self.decks.append(deck)
+        self.merge = PriorityQueue() #each deck's index keyed by the due time of the first card in its schedule
+        for index in range(len(self.decks)):
+            self.updateDeck(index)
+
+    def updateDeck(self,index):
+        """
+        Moves a deck to the due time of the first card in its schedule, called after its schedule changes
+
+        Parameters:
+        index (int): The index of the deck in the session
+
+        Returns:
+        None
+        """
+        schedule = self.decks[index].study_deck.priority_deck
+        if schedule.isEmpty():
+            self.merge.remove(index)
+        else:
+            self.merge.enqueue(schedule.peekPriority(), index)
+
+    def nextCard(self,now=None):
+        """
+        Finds the card that is due first across every deck in the session
+
+        Parameters:
+        now (float): The timestamp to check against (Defaults to the current time)
+
+        Returns:
+        tuple or None: The index of the card's deck and the card, or None if no card is due
+        """
+        if self.merge.isEmpty() or self.merge.peekPriority() > (time.time() if now is None else now):
+            return None
+        index = self.merge.peek()
+        return index, self.decks[index].study_deck.getNextCard()
+
+    def dueCount(self,now=None):
+        return sum(deck.study_deck.dueCount(now) for deck in self.decks)
+
+    def study(self):
+        """
+        A function where the user studies the due cards of every deck in the session, most overdue first
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        if self.dueCount() == 0:
+            print("There are no cards due right now!")
             return
 
-        #Create data structures
-        study_graph = GraphAdjL()
-        deck = DeckSchedule(1,self.study_mode)
-
-        #populate data structures if a cards meets a threshold
-        for card in self.deck:
-            card_study_value = getattr(card, self.study_mode)
-            if card_study_value >= self.card_threshold:  # will apply to both easy and hard
-                deck.addCard(card,card_study_value*-1)
-                study_graph.addVertex(card)
-
-        #add edges to between all cards
-        temp = list(study_graph.graph.keys())
-        for i in range(len(temp)):
-            for n in range(i + 1, len(temp)):
-                study_graph.addEdge(temp[i], temp[n])
-
-        visited = set()
-        card_to_review = None
-
-        while not deck.priority_deck.isEmpty():
-            card_to_review = deck.getNextCard(self.study_mode,card_to_review,study_graph,visited)
-            if card_to_review:
-                print("Question:")
-                print(card_to_review.question)
-                input("\nPress enter to see the answer")
-                print("\nAnswer:")
-                print(card_to_review.answer, "\n")
-
-                while True:
-                    choice = input("1): Again, 2): Hard, 3): Good, 4): Easy, 5): Remove Card, or 6): Exit")
-
-                    if choice == '1':
-                        card_to_review.times_failed += 1
-                        card_to_review.times_reviewed += 1
-                        break
-
-                    elif choice == '2':
-                        card_to_review.times_failed += 1
-                        card_to_review.times_reviewed += 1
-                        break
-
-                    elif choice == '3':
-                        card_study_value = getattr(card_to_review, self.study_mode)
-                        card_to_review.times_correct += 1
-                        card_to_review.times_reviewed += 1
-                        if card_study_value < self.card_threshold:
-                            deck.removeCard()
-                            visited.add(card_to_review.question)
-                            break
-                        deck.removeCard()
-                        deck.updateReviewTime(card_to_review,card_study_value*-1)
-
-                        break
-
-                    elif choice == "4":
-                        card_study_value = getattr(card_to_review, self.study_mode)
-                        card_to_review.times_correct += 1
-                        card_to_review.times_reviewed += 1
-                        if card_study_value < self.card_threshold:
-                            deck.removeCard()
-                            visited.add(card_to_review.question)
-                            break
-                        deck.removeCard()
-                        deck.updateReviewTime(card_to_review,card_study_value*-1)
-                        break
-
-                    elif choice == "5":
-                        deck.removeCard()
-                        visited.add(card_to_review.question)
-                        break
+        while True:
+            found = self.nextCard()
+            if found is None:
+                break
+            index, card_to_review = found
+            print(f"Deck: {os.path.splitext(self.decks[index].deckName)[0]}")
+            keep_going = self.decks[index].reviewCard(card_to_review)
+            self.updateDeck(index)
+            if not keep_going:
+                break
 
-                    elif choice == "6":
-                        return
+        self.close()
 
-                    else:
-                        print("Invalid Input!")
+    def close(self):
+        for deck in self.decks:
+            deck.endSession()
+            deck.flushReviews()
+            deck.store.flush()
+            deck.markWritten()
+            deck.catalog.markStudied(deck.deckName, deck.deck)
 
 class Card:
-    def __init__(self,question,answer,date,row_number,cur_interval,ease_factor,times_reviewed,times_failed,times_correct):
+    #fixed attributes instead of a __dict__ per card keeps large decks small in memory
+    __slots__ = ("question", "answer", "date", "row", "cur_interval", "ease_factor", "times_reviewed", "times_failed",
+                 "times_correct", "next_due")
+    review_time = 1 #default review time, the same for every card
+
+    def __init__(self,question,answer,date,row_number,cur_interval,ease_factor,times_reviewed,times_failed,times_correct,next_due=None):
         """
         A basic card class that makes each card in a deck a card
 
@@ -740,11 +3001,12 @@ class Card:
         answer (str): The answer to a card
         date (str): The date the cards was created on
         row_number (int): A number that shows which row a card is stored in the csv
-        cur_interval (int): The interval of the card
+        cur_interval (float): The interval of the card
         ease_factor (float): The ease factor of the card
         times_reviewed (int): The total times the card has been reviewed
         times_failed (int): Total times the card has been failed
         times_correct (int): Total times the card has been answered correctly
+        next_due (float): The timestamp the card is next due for review (Defaults to when the card was made)
 
         Returns:
         str: The question of a card
@@ -756,12 +3018,12 @@ class Card:
         self.answer = answer
         self.date = date
         self.row = row_number
-        self.review_time = 1 #default review time
-        self.cur_interval = cur_interval
-        self.ease_factor = ease_factor #2.5 default
-        self.times_reviewed = times_reviewed
-        self.times_failed = times_failed
-        self.times_correct = times_correct
+        self.cur_interval = float(cur_interval)
+        self.ease_factor = float(ease_factor) #2.5 default
+        self.times_reviewed = int(times_reviewed)
+        self.times_failed = int(times_failed)
+        self.times_correct = int(times_correct)
+        self.next_due = next_due if next_due is not None else parseTimestamp(date)
 
     @property
     def study_hard(self):
@@ -813,13 +3075,12 @@ class Card:
     def displayDateCreated(self):
         return self.date
 
-    def askCard(self,path,deckName):
+    def askCard(self,store):
         """
         A function that prints a menu where the user can edit a card or exit the menu
 
         Parameters:
-        path (str): A string representing the directory where the decks are stored
-        deckName (str): The name of the selected deck
+        store (CsvDeckStore or SqliteDeckStore): The store of the selected deck
 
         Returns:
         None
@@ -835,25 +3096,21 @@ class Card:
             if edit == "2":
                 break  # break go back
             elif edit == "1":  # edits question
-                self.editCard(path,deckName)
+                self.editCard(store)
                 print("Card successfully edited")
             else:
                 print("Invalid input!")
 
-    def editCard(self,path,deckName):
+    def editCard(self,store):
         """
         A function where the user can edit a cards question or answer
 
         Parameters:
-        path (str): A string representing the directory where the decks are stored
-        deckName (str): The name of the selected deck
+        store (CsvDeckStore or SqliteDeckStore): The store of the selected deck
 
         Return:
         None
         """
-        with open(path + "\\" + deckName, "r", newline="") as f:
-            reader = csv.reader(f)
-            rows = list(reader)  # store rows for editing
         while True:
             print("Old Question:")
             print(self.question)
@@ -861,12 +3118,9 @@ class Card:
                            "\n2): Skip")
             if choice == "1":
                 newQuestion = input("\nWhat is the new question:\n")
-                rows[self.row][0] = newQuestion
-                with open(path + "\\" + deckName, "w", newline='') as f:
-                    w = csv.writer(f)
-                    w.writerows(rows) # write new question
-                    self.question = newQuestion
-                    break
+                self.question = newQuestion
+                store.updateText(self) # write new question
+                break
 
             elif choice == "2":
                 break
@@ -880,12 +3134,9 @@ class Card:
                            "\n2): Skip")
             if choice == "1":
                 newAnswer = input("\nWhat is the new answer:\n")
-                rows[self.row][1] = newAnswer
-                with open(path + "\\" + deckName, "w", newline='') as f:
-                    w = csv.writer(f)
-                    w.writerows(rows)# write new answer
-                    self.answer = newAnswer
-                    break
+                self.answer = newAnswer
+                store.updateText(self) # write new answer
+                break
             elif choice == "2":
                 break
 
@@ -914,19 +3165,21 @@ class Card:
             rows[self.row][5] = self.times_reviewed
             rows[self.row][6] = self.times_failed
             rows[self.row][7] = self.times_correct
+            if len(rows[self.row]) > 8:
+                rows[self.row][8] = formatTimestamp(self.next_due)
 
-        with open(os.path.join(path,deck_name), "w", newline='') as f:
-            w = csv.writer(f)
-            w.writerows(rows)
+        writeDeckRows(os.path.join(path, deck_name), rows)
 
 class DeckSchedule:
-    def __init__(self,interval_modify,study_type):
+    def __init__(self,interval_modify,study_type,hard_multiplier=1.2,easy_bonus=1.5):
         """
         Initializes a deck to be studied as a Priority Queue
 
         Parameters:
         interval_modify (int): The interval for the deck
         study_type (str): The current study mode
+        hard_multiplier (float): How much an answer of Hard multiplies the interval by (Defaults to 1.2)
+        easy_bonus (float): How much an answer of Easy adds to the ease factor (Defaults to 1.5)
 
         Returns:
         None
@@ -934,31 +3187,54 @@ class DeckSchedule:
         self.priority_deck = PriorityQueue()
         self.interval_modify = interval_modify
         self.study_type = study_type
+        self.hard_multiplier = hard_multiplier
+        self.easy_bonus = easy_bonus
+        self.again_delay = 0 #seconds until a card answered with Again is due again
+
+    def emptyCopy(self):
+        """
+        Makes a schedule with no cards that uses the same settings, used when a deck is loaded again
+
+        Parameters:
+        None
+
+        Returns:
+        DeckSchedule: The new schedule
+        """
+        schedule = DeckSchedule(self.interval_modify, self.study_type, self.hard_multiplier, self.easy_bonus)
+        schedule.again_delay = self.again_delay
+        return schedule
 
-    def addCard(self,card,priority=2.5):
+    def addCard(self,card,priority=None):
         """
-        Adds a card with a priority number and their info to the priority queue
+        Adds a card with a priority number and their info to the priority queue, a card that is already in the
+        queue is moved to the new priority instead of being added twice
 
         Parameters:
         card (Card): The card to be added to the priority queue
-        priority (float): The new priority of the card. (Defaults to 2.5)
+        priority (float): The new priority of the card. (Defaults to the card's next_due timestamp)
 
         Returns:
         None
         """
+        if priority is None:
+            priority = card.next_due
         self.priority_deck.enqueue(priority,card)
 
-    def removeCard(self):
+    def removeCard(self,card=None):
         """
-        Removes a card if it is over review date
+        Removes a card from the priority queue
 
         Parameters:
-        None
+        card (Card): The card to remove, or None for the card with the lowest priority (Defaults to None)
 
         Returns:
-        None
+        Card or None: The removed card
         """
-        return self.priority_deck.dequeue()
+        if card is None:
+            return self.priority_deck.dequeue()
+        if self.priority_deck.remove(card):
+            return card
 
     def updateReviewTime(self,card,priority):
         """
@@ -973,6 +3249,130 @@ class DeckSchedule:
         """
         self.addCard(card,priority)
 
+    def nextInterval(self,ease_factor,grade):
+        """
+        Calculates the interval in days a card gets when it is answered with a grade. Takes the values of one card, or
+        NumPy arrays of the values of many cards, so CardBatch and the simulator use the same rules as gradeCard
+
+        Parameters:
+        ease_factor (float or arr): The card's ease factor before the answer
+        grade (int or arr): 1 for Again, 2 for Hard, 3 for Good, or 4 for Easy
+
+        Returns:
+        float or arr: The new interval in days
+        """
+        interval = ease_factor*self.interval_modify
+        if np is not None and isinstance(grade, np.ndarray):
+            return np.where(grade == 1, ease_factor, np.where(grade == 2, interval*self.interval_modify*self.hard_multiplier,
+                                                              interval*ease_factor*self.interval_modify))
+        if grade == 1:
+            return ease_factor
+        if grade == 2:
+            return interval*self.interval_modify*self.hard_multiplier
+        return interval*ease_factor*self.interval_modify
+
+    def nextEase(self,ease_factor,grade):
+        """
+        Calculates a card's ease factor after it is answered with a grade, only an answer of Easy changes it. Takes
+        the values of one card or NumPy arrays of the values of many cards
+
+        Parameters:
+        ease_factor (float or arr): The card's ease factor before the answer
+        grade (int or arr): 1 for Again, 2 for Hard, 3 for Good, or 4 for Easy
+
+        Returns:
+        float or arr: The new ease factor
+        """
+        if np is not None and isinstance(grade, np.ndarray):
+            return np.where(grade == 4, ease_factor + self.easy_bonus, ease_factor)
+        return ease_factor + self.easy_bonus if grade == 4 else ease_factor
+
+    def gradeCard(self,card,grade,now=None):
+        """
+        Updates a card's ease factor, interval, and next due time after it is answered and moves it in the queue
+
+        Parameters:
+        card (Card): The card that was answered
+        grade (int): 1 for Again, 2 for Hard, 3 for Good, or 4 for Easy
+        now (float): The timestamp of the answer (Defaults to the current time)
+
+        Returns:
+        None
+        """
+        if now is None:
+            now = time.time()
+        card.times_reviewed += 1
+        if grade <= 2:
+            card.times_failed += 1
+        else:
+            card.times_correct += 1
+
+        card.cur_interval = self.nextInterval(card.ease_factor, grade)
+        card.ease_factor = self.nextEase(card.ease_factor, grade)
+        if grade == 1:
+            card.next_due = now + self.again_delay
+        else:
+            card.next_due = now + card.cur_interval*86400 #intervals are in days
+        self.updateReviewTime(card,card.next_due)
+
+    def walkDue(self,until):
+        """
+        Finds the heap entries due before a time by only walking down the heap while entries are due, so it
+        takes O(k) for k due entries instead of looking at the whole deck
+
+        Parameters:
+        until (float): The timestamp to find entries due up to
+
+        Returns:
+        list: The due [priority, order, card] entries in no particular order
+        """
+        heap = self.priority_deck.heap
+        due = []
+        stack = [0] if heap else []
+        while stack:
+            index = stack.pop()
+            if index < len(heap) and heap[index][0] <= until:
+                due.append(heap[index])
+                stack.append(2 * index + 1)
+                stack.append(2 * index + 2)
+        return due
+
+    def dueCards(self,now=None):
+        """
+        Lists the cards that are due for review in O(k log k) for k due cards
+
+        Parameters:
+        now (float): The timestamp to check against (Defaults to the current time)
+
+        Returns:
+        list: The due cards, most overdue first
+        """
+        due = self.walkDue(time.time() if now is None else now)
+        due.sort(key=lambda entry: entry[:2])
+        return [entry[2] for entry in due]
+
+    def dueCount(self,now=None):
+        return len(self.walkDue(time.time() if now is None else now))
+
+    def dueForecast(self,days,now=None):
+        """
+        Counts how many cards are due on each of the next days, overdue cards count as due on the first day
+
+        Parameters:
+        days (int): The number of days to count
+        now (float): The timestamp the first day starts at (Defaults to the current time)
+
+        Returns:
+        list: The number of cards due on each day
+        """
+        if now is None:
+            now = time.time()
+        counts = [0] * days
+        for entry in self.walkDue(now + days * 86400):
+            day = int((entry[0] - now) // 86400)
+            counts[min(max(day, 0), days - 1)] += 1
+        return counts
+
     def getNextCard(self,atrb=None,cur_card=None,graph=None,visited=None):
         """
         A function that returns the next best card based on the study_mode.
@@ -980,33 +3380,182 @@ class DeckSchedule:
         Parameters:
         atrb (str): The study_mode variable that determines what the next best card is
         cur_card (Card): The current card that is being studied
-        graph (GraphAdjl): A graph that shows the relationships between cards
+        graph (ImplicitGraph): A graph that shows the relationships between cards
         visited (set): A set containing cards that are already visited
 
         Returns:
         Card or None: The next card to be studied or None if there is no card found
         """
 
-        next_card = None
-        if cur_card:
-            if self.study_type != "review_time":
-                cur_highest = 0
-                for neighbor in graph.graph[cur_card]:
-                    if neighbor.question not in visited:
-                        if getattr(neighbor,atrb) > cur_highest:
-                            cur_highest = getattr(neighbor,atrb)
-                            next_card = neighbor
-                        if getattr(cur_card,atrb) > getattr(next_card,atrb) and cur_card not in visited:
-                            return cur_card
-                        else:
-                            return
-                return next_card
+        if self.study_type != "review_time" and graph is not None:
+            next_card = graph.bestNeighbor(cur_card, visited)
+            #stay on the current card if it is still better than all of its neighbors
+            if cur_card is not None and graph.hasVertex(cur_card) and cur_card not in visited:
+                if next_card is None or getattr(cur_card,atrb) > getattr(next_card,atrb):
+                    return cur_card
+            return next_card
+
+        elif not cur_card:
+            return self.priority_deck.peek()
+
+class Profiler:
+    #class, method, and report name of every timed method
+    methods = [("Deck", "extractDeck", "Deck.extractDeck"), ("Deck", "flushReviews", "Deck.flushReviews"),
+               ("DeckSnapshot", "load", "DeckSnapshot.load"), ("ReviewJournal", "append", "ReviewJournal.append"),
+               ("ReviewJournal", "compact", "csv rewrite (journal compact)"),
+               ("CsvDeckStore", "updateText", "csv rewrite (card text)"), ("SqliteDeckStore", "updateMany", "SqliteDeckStore.updateMany"),
+               ("Card", "editCardValues", "Card.editCardValues"),
+               ("HashTable", "insert", "HashTable.insert"), ("HashTable", "get", "HashTable.get"), ("HashTable", "delete", "HashTable.delete"),
+               ("PriorityQueue", "enqueue", "PriorityQueue push"), ("PriorityQueue", "dequeue", "PriorityQueue pop"),
+               ("PriorityQueue", "remove", "PriorityQueue remove"), ("DeckSchedule", "getNextCard", "DeckSchedule.getNextCard"),
+               ("DeckSchedule", "gradeCard", "DeckSchedule.gradeCard"), ("ImplicitGraph", "addVertex", "graph addVertex"),
+               ("ImplicitGraph", "bestNeighbor", "graph bestNeighbor")]
 
-        else:
-            return self.priority_deck.heap[0][1]
+    def __init__(self):
+        """
+        Counts and times calls to the methods on the app's hot paths. Nothing is measured until install() wraps the
+        methods, so the app runs at full speed when profiling is off. Every method keeps a histogram of its latencies
+        in power of two microsecond buckets, and HashTable keeps a histogram of its probe lengths
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        self.stats = {} #name -> [calls, total seconds, most seconds, {bucket: calls}]
+        self.probes = {} #probe length -> operations
+        self.installed = False
+
+    def record(self,name,seconds):
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = [0, 0.0, 0.0, {}]
+        stat[0] += 1
+        stat[1] += seconds
+        if seconds > stat[2]:
+            stat[2] = seconds
+        bucket = int(seconds * 1000000).bit_length() #calls that took under 2 ** bucket microseconds
+        stat[3][bucket] = stat[3].get(bucket, 0) + 1
+
+    def wrap(self,cls,method,name):
+        func = getattr(cls, method)
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        setattr(cls, method, timed)
+
+    def install(self):
+        """
+        Wraps every profiled method so its calls are timed, and counts the probe length of every HashTable operation
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        if self.installed:
+            return
+        self.installed = True
+        for cls, method, name in self.methods:
+            self.wrap(globals()[cls], method, name)
+        record_probe = HashTable.recordProbe
+
+        def countedProbe(table, probes):
+            self.probes[probes] = self.probes.get(probes, 0) + 1
+            record_probe(table, probes)
+        HashTable.recordProbe = countedProbe
+
+    def percentile(self,stat,fraction):
+        calls, total, most, buckets = stat
+        seen = 0
+        for bucket in sorted(buckets):
+            seen += buckets[bucket]
+            if seen >= calls * fraction:
+                return min(2 ** bucket / 1000, most * 1000) #upper bound of the bucket in milliseconds
+        return most * 1000
+
+    def report(self,file=None):
+        """
+        Prints the calls, total time, and latency percentiles of every profiled method, slowest total first, and the
+        HashTable probe lengths
+
+        Parameters:
+        file (file): Where to print the report (Defaults to standard output)
+
+        Returns:
+        None
+        """
+        file = file or sys.stdout
+        if not self.stats and not self.probes:
+            print("Nothing has been profiled yet", file=file)
+            return
+        print(f"{'operation':<32}{'calls':>10}{'total ms':>12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}", file=file)
+        for name, stat in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+            calls, total, most, buckets = stat
+            print(f"{name:<32}{calls:>10}{total * 1000:>12.2f}{total * 1000 / calls:>10.3f}{self.percentile(stat, 0.5):>10.3f}"
+                  f"{self.percentile(stat, 0.95):>10.3f}{self.percentile(stat, 0.99):>10.3f}{most * 1000:>10.3f}", file=file)
+        if self.probes:
+            operations = sum(self.probes.values())
+            mean = sum(length * count for length, count in self.probes.items()) / operations
+            lengths = ", ".join(f"{length}: {count}" for length, count in sorted(self.probes.items()))
+            print(f"HashTable probes: {operations} operations, {mean:.2f} probes on average, max {max(self.probes)}", file=file)
+            print(f"HashTable probe lengths: {lengths}", file=file)
 
 directory = os.path.join(".", "Decks") + os.sep # replace with any desired path to store the decks
 
+pending_decks = weakref.WeakSet() #decks with reviews that have not been written yet
+
+@atexit.register
+def flushPendingDecks():
+    """
+    Writes the waiting reviews of every deck when Python exits
+
+    Parameters
+    None
+
+    Returns
+    None
+    """
+    for pending_deck in list(pending_decks):
+        try:
+            pending_deck.flushReviews()
+        except Exception as e:
+            print(e)
+
+def parseTimestamp(text):
+    """
+    Turns a date written as "YYYY-MM-DD HH:MM:SS" into a timestamp
+
+    Parameters
+    text (str): The date to parse
+
+    Returns
+    float: The timestamp of the date, or 0 if the date could not be read
+    """
+    try:
+        return dt.fromisoformat(text).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+def formatTimestamp(seconds):
+    """
+    Turns a timestamp into a date written as "YYYY-MM-DD HH:MM:SS", the same way a card's date created is stored
+
+    Parameters
+    seconds (float): The timestamp to format
+
+    Returns
+    str: The formatted date
+    """
+    return dt.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S")
+
 def printCards(deck):
     """
     Print all the cards information in a deck
@@ -1021,30 +3570,267 @@ def printCards(deck):
         print(f"{n}): Question): {card.question} Answer):{card.answer} Date Created): {card.date}")
     print(f"{len(deck) + 1}): Back")
 
-def quickSort(ar, low, high, obj_func):
-    if low >= high:
-        return
+def listDeckFiles(path):
+    """
+    Lists the files of every deck in a directory, both csv and SQLite decks
+
+    Parameters
+    path (str): A string representing the directory where the decks are stored
+
+    Returns
+    list: A sorted list of the deck file names
+    """
+    return sorted(d for d in os.listdir(path) if os.path.splitext(d)[1] in (".csv", ".db"))
+
+def writeDeckRows(file, rows):
+    """
+    Writes every row of a deck csv to a temporary file that then replaces the deck, so the deck is never left half
+    written
+
+    Parameters
+    file (str): The path of the deck's csv
+    rows (arr): The rows of the csv, header included
+
+    Returns
+    None
+    """
+    with open(file + ".tmp", "w", newline='') as f:
+        w = csv.writer(f)
+        w.writerows(rows)
+    os.replace(file + ".tmp", file)
+
+def openDeckStore(path, deckName):
+    """
+    Opens the store for a deck based on its file extension
+
+    Parameters
+    path (str): A string representing the directory where the decks are stored
+    deckName (str): The name of the deck's file
+
+    Returns
+    CsvDeckStore or SqliteDeckStore: The store of the deck
+    """
+    if deckName.endswith(".db"):
+        return SqliteDeckStore(path, deckName)
+    return CsvDeckStore(path, deckName)
+
+def migrateDeckStore(path, oldName, newName):
+    """
+    Copies every card of a deck into a deck of another format and removes the old deck
+
+    Parameters
+    path (str): A string representing the directory where the decks are stored
+    oldName (str): The file name of the deck to convert
+    newName (str): The file name of the converted deck, its extension picks the format
+
+    Returns
+    None
+    """
+    old_store = openDeckStore(path, oldName)
+    cards = old_store.loadCards()
+    if newName.endswith(".db"):
+        new_store = SqliteDeckStore(path, newName)
+        with new_store.connection:
+            new_store.connection.executemany("INSERT INTO cards (row, question, question_key, answer, date_created, cur_interval, "
+                                             "ease_factor, times_reviewed, times_failed, times_correct, next_due) "
+                                             "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                             ((n, card.question, card.question.lower(), card.answer, card.date, float(card.cur_interval),
+                                               card.ease_factor, card.times_reviewed, card.times_failed, card.times_correct,
+                                               formatTimestamp(card.next_due))
+                                              for n, card in enumerate(cards, 1)))
+        new_store.connection.close()
+    else:
+        with open(os.path.join(path, newName), "w", newline='') as f:
+            w = csv.writer(f)
+            w.writerow(DECK_HEADER)
+            w.writerows([card.question, card.answer, card.date, card.cur_interval, card.ease_factor, card.times_reviewed,
+                         card.times_failed, card.times_correct, formatTimestamp(card.next_due)] for card in cards)
+
+    if isinstance(old_store, SqliteDeckStore):
+        old_store.connection.close()
+    elif os.path.exists(old_store.journal.file):
+        os.remove(old_store.journal.file)
+    os.remove(os.path.join(path, oldName))
+
+def checkDeckRow(line,columns):
+    """
+    Checks that one row of a deck csv can be read as a card
+
+    Parameters
+    line (arr): The row's values
+    columns (int): The number of columns in the deck's header, 8 or 9
+
+    Returns
+    str or None: What is wrong with the row, or None if it is valid
+    """
+    if len(line) != columns:
+        return f"expected {columns} fields but found {len(line)}"
+    for column in (3, 4):
+        try:
+            float(line[column])
+        except ValueError:
+            return f"{DECK_HEADER[column]} is not a number: {line[column]!r}"
+    for column in (5, 6, 7):
+        if not line[column].isdigit():
+            return f"{DECK_HEADER[column]} is not a whole number: {line[column]!r}"
+    for column in (2, 8)[:columns - 7]:
+        try:
+            dt.strptime(line[column], "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            return f"{DECK_HEADER[column]} is not a YYYY-MM-DD HH:MM:SS date: {line[column]!r}"
+    return None
+
+def repairDeckRow(line,columns,now):
+    """
+    Fills in or replaces the values of a deck csv row that can not be read, keeping the question and answer
+
+    Parameters
+    line (arr): The row's values
+    columns (int): The number of columns in the deck's header, 8 or 9
+    now (str): The date to use for a missing or unreadable date created
+
+    Returns
+    arr or None: The repaired row with every column of DECK_HEADER, or None if it has no question and answer
+    """
+    if len(line) < 2 or not line[0].strip() or not line[1].strip():
+        return None
+    defaults = [line[0], line[1], now, "1", "2.5", "0", "0", "0", None]
+    repaired = line[:columns] + defaults[min(len(line), columns):]
+    for column in (3, 4):
+        try:
+            float(repaired[column])
+        except ValueError:
+            repaired[column] = defaults[column]
+    for column in (5, 6, 7):
+        if not repaired[column].isdigit():
+            repaired[column] = defaults[column]
+    for column in (2, 8):
+        try:
+            dt.strptime(repaired[column], "%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError):
+            #cards with no next due date are due from when they were made
+            repaired[column] = now if column == 2 else repaired[2]
+    return repaired
+
+def importDeckFile(source, destination, mode="strict", max_errors=20):
+    """
+    Checks every row of a deck csv while writing it to the decks directory in the same pass, one row at a time so
+    decks of any size are imported in constant memory. The deck is written to a temporary file that only replaces
+    the destination once the whole file was read. It only uses its arguments so it can be run in a worker process
+
+    Parameters
+    source (str): The path of the deck csv to import
+    destination (str): The path to write the deck to
+    mode (str): What to do with invalid rows, "strict" to import nothing if there are any, "skip" to leave them out,
+    or "repair" to fill in the values that can not be read (Defaults to "strict")
+    max_errors (int): The most errors to list in the report, the rest are only counted (Defaults to 20)
+
+    Returns
+    dict: A report with the file, the number of rows, the number of errors, the first errors as (line, message), the
+    number of rows skipped and repaired, and whether the deck was imported
+    """
+    report = {"file": source, "rows": 0, "error_count": 0, "errors": [], "skipped": 0, "repaired": 0, "imported": False}
+    now = dt.now().strftime("%Y-%m-%d %H:%M:%S")
+    partial = None
+    try:
+        #a temporary file of its own, so imports running at the same time never write to the same file
+        fd, partial = tempfile.mkstemp(prefix=os.path.basename(destination) + ".", suffix=".part", dir=os.path.dirname(destination) or ".")
+        with os.fdopen(fd, "w", newline="") as out, open(source, "r", newline="") as f:
+            reader = csv.reader(f)
+            w = csv.writer(out)
+            header = next(reader, None)
+            if header not in (DECK_HEADER, DECK_HEADER[:8]):
+                report["error_count"] = 1
+                report["errors"].append((1, "invalid header"))
+            else:
+                w.writerow(DECK_HEADER)
+                for line in reader:
+                    report["rows"] += 1
+                    error = checkDeckRow(line, len(header))
+                    if error:
+                        report["error_count"] += 1
+                        if len(report["errors"]) < max_errors:
+                            report["errors"].append((reader.line_num, error))
+                        line = repairDeckRow(line, len(header), now) if mode == "repair" else None
+                        if line is None:
+                            if mode != "strict": #a strict import writes nothing, so no row is skipped
+                                report["skipped"] += 1
+                            continue
+                        report["repaired"] += 1
+                    elif len(line) < len(DECK_HEADER):
+                        line.append(line[2]) #older decks, cards are due from when they were made
+                    w.writerow(line)
+        if header in (DECK_HEADER, DECK_HEADER[:8]) and (mode != "strict" or report["error_count"] == 0):
+            #the journal and snapshot of a deck being replaced would be applied to the new deck's cards
+            for stale in (destination + ".journal", destination + ".snapshot"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            os.replace(partial, destination)
+            report["imported"] = True
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        report["error_count"] += 1
+        report["errors"].append((0, str(e)))
+    if partial is not None and os.path.exists(partial):
+        os.remove(partial)
+    return report
+
+def sortKey(attribute):
+    """
+    Makes the function that gives a card's sort key for an attribute, dates are compared as datetimes
 
-    pivot_index = random.randint(low, high)
-    ar[pivot_index], ar[high] = ar[high], ar[pivot_index]
-    pivot = getattr(ar[high], obj_func)
+    Parameters
+    attribute (str): The card attribute to sort by ("answer", "question", or "date")
 
-    i = low - 1
-    for j in range(low, high):
-        if getattr(ar[j], obj_func) < pivot:
-            i += 1
-            ar[i], ar[j] = ar[j], ar[i]
+    Returns
+    function: A function that takes a card and returns its sort key
+    """
+    if attribute == "date":
+        def dateKey(card):
+            try:
+                return dt.fromisoformat(card.date)
+            except (TypeError, ValueError):
+                return dt.min #cards with unreadable dates sort first
+        return dateKey
+    return lambda card: getattr(card, attribute)
 
-    ar[i + 1], ar[high] = ar[high], ar[i + 1]
-    partition_index = i + 1
+def quickSort(ar, low, high, obj_func):
+    """
+    Sorts part of a list of cards in place by an attribute. Kept for older callers, it now uses a stable key sort
+    instead of a recursive quicksort
 
-    quickSort(ar, low, partition_index - 1, obj_func)
-    quickSort(ar, partition_index + 1, high, obj_func)
+    Parameters
+    ar (arr): The cards to sort
+    low (int): The index of the first card to sort
+    high (int): The index of the last card to sort
+    obj_func (str): The card attribute to sort by ("answer", "question", or "date")
 
+    Returns
+    arr: The sorted list
+    """
+    ar[low:high + 1] = sorted(ar[low:high + 1], key=sortKey(obj_func))
     return ar
 
 deck = Deck(directory)
 
+profiler = Profiler()
+
+def enableProfiling():
+    """
+    Turns profiling on and prints the report to standard error when the application closes
+
+    Parameters
+    None
+
+    Returns
+    None
+    """
+    if not profiler.installed:
+        profiler.install()
+        atexit.register(profiler.report, sys.stderr)
+
+if os.environ.get("FLASHCARD_PROFILE", "") not in ("", "0"):
+    enableProfiling()
+
 def main():
     while True:
         print("\n"*2)
@@ -1056,9 +3842,14 @@ def main():
               "\n5): Export Deck"
               "\n6): Import Deck"
               "\n7): Exit"
+              "\n8): Convert Deck Format"
+              "\n9): Study Multiple Decks"
+              "\n10): Import Review Results"
+              + ("\n11): Profiling Report" if profiler.installed else "")
               )
         menuChoice = input("Choose an option:\n")
 
+        #Exit keeps the number it always had, newer options come after it
         if menuChoice == "7":
             break
         elif menuChoice == "1":
@@ -1074,8 +3865,18 @@ def main():
             deck.exportDeck()
         elif menuChoice == "6":
             deck.importDeck()
+        elif menuChoice == "8":
+            deck.migrateDeck()
+        elif menuChoice == "9":
+            deck.studyMultipleDecks()
+        elif menuChoice == "10":
+            deck.importReviews()
+        elif menuChoice == "11" and profiler.installed:
+            profiler.report()
         else:
             print("Invalid Input!")
 
 if __name__ == "__main__":
+    if "--profile" in sys.argv[1:]:
+        enableProfiling()
     main()
\ No newline at end of file
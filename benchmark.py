@@ -0,0 +1,203 @@
+import argparse, builtins, contextlib, csv, io, itertools, json, os, platform, random, shutil, sys, tempfile, time, tracemalloc
+
+import Flashcard
+from Flashcard import Deck, CardBatch, ImplicitGraph, DECK_HEADER, quickSort
+
+WORDS = ("the what which capital river mountain year king war treaty cell atom energy force formula verb noun "
+         "tense plural function theorem prime graph tree heap queue stack language history planet element").split()
+
+def generateDeck(file, cards, seed=0):
+    """
+    Writes a deck csv of made up cards in the 8 column layout decks had before next_due was added, so the
+    benchmarks also cover reading older decks
+
+    Parameters
+    file (str): The path of the csv to write
+    cards (int): The number of cards in the deck
+    seed (int): The seed of the random values, the same seed always makes the same deck (Defaults to 0)
+
+    Returns
+    None
+    """
+    rng = random.Random(seed)
+    start = time.time() - 365 * 86400
+    with open(file, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(DECK_HEADER[:8])
+        for n in range(cards):
+            reviewed = rng.randint(0, 30)
+            failed = rng.randint(0, reviewed)
+            w.writerow([f"{' '.join(rng.choices(WORDS, k=rng.randint(3, 8)))} {n}?",
+                        " ".join(rng.choices(WORDS, k=rng.randint(1, 6))),
+                        time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start + rng.random() * 365 * 86400)),
+                        round(rng.uniform(1, 60), 2), round(rng.uniform(1.3, 6), 2), reviewed, failed, reviewed - failed])
+
+@contextlib.contextmanager
+def headless(answers):
+    """
+    Runs the interactive parts of the app without a user, input() gives the answers in order and output is dropped
+
+    Parameters
+    answers (iterable): The answers input() returns
+
+    Returns
+    None
+    """
+    answers = iter(answers)
+    real_input = builtins.input
+    builtins.input = lambda prompt="": next(answers)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        builtins.input = real_input
+
+def measure(operation, cards, run, memory=True, repeat=1):
+    """
+    Times one operation and records the most memory it allocated at once
+
+    Parameters
+    operation (str): The name of the operation
+    cards (int): The size of the deck
+    run (function): Runs the operation once
+    memory (bool): If True the peak memory is traced, which also slows the operation down (Defaults to True)
+    repeat (int): How many times run is called, the time is reported per call (Defaults to 1)
+
+    Returns
+    dict: The result of the operation
+    """
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    seconds = (time.perf_counter() - start) / repeat
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"operation": operation, "cards": cards, "seconds": seconds, "peak_bytes": peak, "calls": repeat}
+
+def loadDeck(path, deckName, snapshot=False):
+    deck = Deck(path)
+    deck.deckName = deckName
+    if not snapshot:
+        deck.snapshot_min_cards = float("inf")
+    with headless(()):
+        deck.extractDeck()
+    return deck
+
+def benchmarkSize(path, cards, memory=True, seed=0):
+    """
+    Runs every benchmark on a made up deck of one size
+
+    Parameters
+    path (str): A directory for the benchmark decks, it is emptied between sizes
+    cards (int): The number of cards in the deck
+    memory (bool): If True peak memory is traced (Defaults to True)
+    seed (int): The seed of the made up deck (Defaults to 0)
+
+    Returns
+    list: The result of every operation
+    """
+    deckName = f"bench_{cards}.csv"
+    generateDeck(os.path.join(path, deckName), cards, seed)
+    rng = random.Random(seed)
+    results = []
+
+    results.append(measure("extract_deck", cards, lambda: loadDeck(path, deckName), memory))
+    deck = loadDeck(path, deckName, snapshot=True) #writes the snapshot when the deck is big enough
+    if os.path.exists(os.path.join(path, deckName + ".snapshot")):
+        results.append(measure("extract_deck_snapshot", cards, lambda: loadDeck(path, deckName, snapshot=True), memory))
+
+    results.append(measure("hash_table_build", cards, deck.lookupTable, memory))
+    questions = [card.question for card in rng.sample(deck.deck, min(1000, cards))]
+    results.append(measure("hash_table_lookup", cards, lambda: [deck.findCard(question) for question in questions], memory))
+
+    for attribute in ("question", "answer", "date"):
+        results.append(measure(f"quick_sort_{attribute}", cards,
+                               lambda: quickSort(list(deck.deck), 0, cards - 1, attribute), memory))
+    results.append(measure("sorted_index_build", cards, lambda: deck.sortedIndex("question"), memory))
+    results.append(measure("sort_deck_indexed", cards, lambda: deck.sortDeck("question"), memory))
+
+    results.append(measure("keyword_index_build", cards, deck.keywordIndex, memory))
+    queries = [" ".join(rng.choices(WORDS, k=2)) for _ in range(100)]
+    results.append(measure("keyword_search", cards, lambda: [deck.searchCards(query, 20) for query in queries], memory))
+    #the first fuzzy search also builds the trigram index
+    results.append(measure("fuzzy_search_first", cards, lambda: deck.fuzzySearch(questions[0][:-3]), memory))
+    results.append(measure("fuzzy_search", cards, lambda: [deck.fuzzySearch(question[:-3]) for question in questions[:20]], memory))
+    results[-1]["calls"] = min(20, len(questions))
+    results[-1]["seconds"] /= results[-1]["calls"]
+
+    for mode in ("study_hard", "study_easy"):
+        def buildStudyGraph():
+            #the same selection customStudy makes
+            graph = ImplicitGraph(mode)
+            selected, values = CardBatch(deck.deck).thresholdCards(mode, deck.card_threshold)
+            for card, value in zip(selected, values):
+                graph.addVertex(card, value)
+            return graph
+        results.append(measure(f"custom_study_graph_{mode}", cards, buildStudyGraph, memory))
+
+        def customStudySession():
+            deck.study_mode = mode
+            with headless(itertools.chain(*[("", "3")] * 50, ("", "6"))):
+                deck.customStudy()
+            deck.study_mode = "review_time"
+        results.append(measure(f"custom_study_session_{mode}", cards, customStudySession, memory))
+
+    def studySession():
+        grades = [rng.choice("1234") for _ in range(200)]
+        with headless(itertools.chain(*[("", grade) for grade in grades], ("", "6"))):
+            deck.studyDeck()
+    results.append(measure("study_session_200_answers", cards, studySession, memory))
+
+    #the write path of a study session: flushReviews appends the waiting reviews to the journal, and the
+    #journal is compacted into the csv when the session ends
+    reviewed = rng.sample(deck.deck, min(deck.flush_size, cards))
+    def flushReviews():
+        deck.pending = {card.row: card for card in reviewed}
+        deck.flushReviews()
+    results.append(measure("flush_reviews_100", cards, flushReviews, memory))
+    results.append(measure("journal_compact", cards, deck.store.flush, memory))
+
+    edited = rng.sample(deck.deck, min(3, cards))
+    results.append(measure("edit_card_values", cards,
+                           lambda: [card.editCardValues(path, deckName, card.ease_factor, card.cur_interval) for card in edited],
+                           memory))
+    results[-1]["calls"] = len(edited)
+    results[-1]["seconds"] /= len(edited)
+
+    for file in os.listdir(path):
+        os.remove(os.path.join(path, file))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the flashcard app on made up decks and prints the results as JSON")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000],
+                        help="deck sizes to benchmark, up to 1000000 (default: 100 1000 10000 100000)")
+    parser.add_argument("--output", help="write the JSON results to this file instead of printing them")
+    parser.add_argument("--no-memory", action="store_true", help="do not trace peak memory, which makes the times more accurate")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the made up decks")
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp(prefix="flashcard_bench_")
+    try:
+        results = []
+        for cards in args.sizes:
+            print(f"Benchmarking {cards} cards", file=sys.stderr)
+            results.extend(benchmarkSize(path, cards, not args.no_memory, args.seed))
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+    report = {"python": platform.python_version(), "platform": platform.platform(),
+              "numpy": Flashcard.np is not None, "memory_traced": not args.no_memory,
+              "time": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import argparse, asyncio, json, os, shutil, sys, tempfile, time
+
+from Flashcard import directory
+from server import DeckServer
+
+async def request(host, port, method, target, body=None):
+    """
+    Sends one request to the deck server on its own connection
+
+    Parameters
+    host (str): The server's address
+    port (int): The server's port
+    method (str): The HTTP method
+    target (str): The path and query string
+    body (dict): The JSON body to send (Defaults to no body)
+
+    Returns
+    tuple: The status code and the decoded JSON response
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        data = json.dumps(body).encode() if body is not None else b""
+        writer.write(f"{method} {target} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(data)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + data)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            if key.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await reader.readexactly(length))
+    finally:
+        writer.close()
+
+async def session(host, port, deckName, failures):
+    """
+    Runs one study session against a deck: gets the next card, answers it, searches, and asks for the due count
+
+    Parameters
+    host (str): The server's address
+    port (int): The server's port
+    deckName (str): The deck to study
+    failures (list): Where a description of every unexpected response is added
+
+    Returns
+    None
+    """
+    def check(what, status, response, expected=200):
+        if status != expected:
+            failures.append(f"{what}: expected {expected}, got {status} {response}")
+            return False
+        return True
+
+    status, response = await request(host, port, "GET", f"/decks/{deckName}/next")
+    if check("next", status, response) and response["card"] is not None:
+        status, response = await request(host, port, "POST", f"/decks/{deckName}/grade",
+                                         {"row": response["card"]["row"], "grade": 3})
+        check("grade", status, response)
+    status, response = await request(host, port, "GET", f"/decks/{deckName}/search?q=the&limit=5")
+    if check("search", status, response) and len(response["cards"]) > 5:
+        failures.append(f"search: asked for 5 cards, got {len(response['cards'])}")
+    status, response = await request(host, port, "GET", f"/decks/{deckName}/due")
+    if check("due", status, response) and len(response["forecast"]) != 7:
+        failures.append(f"due: expected a 7 day forecast, got {response['forecast']}")
+
+async def checkErrors(host, port, deckName, failures):
+    """
+    Checks that bad requests are turned away with the right status
+
+    Parameters
+    host (str): The server's address
+    port (int): The server's port
+    deckName (str): A deck that exists
+    failures (list): Where a description of every unexpected response is added
+
+    Returns
+    None
+    """
+    cases = [("GET", "/nothing", None, 404), ("GET", f"/decks/{deckName}/nothing", None, 404),
+             ("GET", f"/decks/{deckName}/grade", None, 405), ("GET", "/decks/missing.csv/next", None, 404),
+             ("GET", "/decks/..%2Fserver.py/next", None, 404), ("GET", "/decks/..%2F..%2Fetc%2Fpasswd/next", None, 404),
+             ("POST", f"/decks/{deckName}/grade", {"row": 1, "grade": 5}, 400),
+             ("POST", f"/decks/{deckName}/grade", {"row": "first"}, 400)]
+    for method, target, body, expected in cases:
+        status, response = await request(host, port, method, target, body)
+        if status != expected:
+            failures.append(f"{method} {target}: expected {expected}, got {status} {response}")
+
+async def run(host, port, sessions):
+    """
+    Runs many study sessions at once against a deck server and checks every response
+
+    Parameters
+    host (str): The server's address
+    port (int): The server's port
+    sessions (int): The number of sessions to run at once
+
+    Returns
+    list: A description of every unexpected response, empty when everything worked
+    """
+    failures = []
+    status, decks = await request(host, port, "GET", "/decks")
+    if status != 200 or not decks:
+        return [f"/decks: expected a list of decks, got {status} {decks}"]
+    names = [deck["deck"] for deck in decks]
+    await checkErrors(host, port, names[0], failures)
+    start = time.perf_counter()
+    await asyncio.gather(*[session(host, port, names[n % len(names)], failures) for n in range(sessions)])
+    print(f"{sessions} sessions over {len(names)} decks in {time.perf_counter() - start:.2f} seconds", file=sys.stderr)
+    return failures
+
+async def runLocal(sessions):
+    """
+    Starts a deck server over a copy of the decks, so nothing is changed, and runs the sessions against it
+
+    Parameters
+    sessions (int): The number of sessions to run at once
+
+    Returns
+    list: A description of every unexpected response
+    """
+    path = tempfile.mkdtemp(prefix="flashcard_client_")
+    try:
+        for file in os.listdir(directory):
+            if os.path.splitext(file)[1] in (".csv", ".db"):
+                shutil.copy(os.path.join(directory, file), path)
+        deck_server = DeckServer(path + os.sep)
+        server = await deck_server.start(port=0)
+        try:
+            return await run("127.0.0.1", server.sockets[0].getsockname()[1], sessions)
+        finally:
+            server.close()
+            await server.wait_closed()
+            deck_server.close()
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs many study sessions at once against the deck server and checks the responses")
+    parser.add_argument("--host", default="127.0.0.1", help="address of a running server (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="port of a running server, without it a server is started over a copy of the decks")
+    parser.add_argument("--sessions", type=int, default=200, help="study sessions to run at once (default: 200)")
+    args = parser.parse_args()
+
+    if args.port is None:
+        failures = asyncio.run(runLocal(args.sessions))
+    else:
+        failures = asyncio.run(run(args.host, args.port, args.sessions))
+    for failure in failures:
+        print(failure)
+    if failures:
+        sys.exit(f"{len(failures)} checks failed")
+    print("All checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import asyncio, json, sys, time
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from Flashcard import Deck, DeckCatalog, directory, formatTimestamp, listDeckFiles
+
+class DeckServer:
+    def __init__(self,path):
+        """
+        A local HTTP server that answers JSON requests for many study sessions at once from one process. Decks are
+        loaded once and shared by every request, and each deck has a lock so only one request uses it at a time while
+        requests for other decks carry on. Deck work runs in worker threads so a large deck loading does not hold up
+        the other decks. A timer writes the answers of decks nobody is answering any more once they have waited for
+        the deck's flush_interval
+
+        Parameters:
+        path (str): A string representing the directory where the decks are stored
+
+        Returns:
+        None
+        """
+        self.path = path
+        self.catalog = DeckCatalog(path)
+        self.decks = {} #deck file name -> loaded Deck
+        self.locks = {} #deck file name -> asyncio.Lock
+        self.catalog_lock = asyncio.Lock()
+        self.flush_period = 30 #seconds between checks for reviews that have waited too long
+        self.flush_task = None
+        self.routes = {("GET", "next"): self.nextCard, ("POST", "grade"): self.gradeCard,
+                       ("GET", "search"): self.searchCards, ("GET", "due"): self.dueCards}
+
+    def listDecks(self):
+        """
+        Lists every deck with the stats kept in the deck catalog
+
+        Parameters:
+        None
+
+        Returns:
+        list: A dictionary of the name, card count, cards due today, and last studied time of every deck
+        """
+        names = listDeckFiles(self.path)
+        entries = self.catalog.refresh(names)
+        decks = []
+        for name in names:
+            entry = entries.get(name)
+            decks.append({"deck": name,
+                          "cards": entry["cards"] if entry else None,
+                          "due_today": DeckCatalog.dueToday(entry) if entry else None,
+                          "last_studied": formatTimestamp(entry["last_studied"]) if entry and entry["last_studied"] else None})
+        return decks
+
+    async def getDeck(self,name):
+        """
+        Gets a loaded deck, loading it the first time it is asked for. Must be called while holding the deck's lock
+
+        Parameters:
+        name (str): The deck's file name
+
+        Returns:
+        Deck: The loaded deck
+        """
+        if name not in self.decks:
+            deck = Deck(self.path)
+            deck.deckName = name
+            if await asyncio.to_thread(deck.extractDeck) is None:
+                raise RequestError(500, f"could not load {name}")
+            self.decks[name] = deck
+        return self.decks[name]
+
+    async def flushStale(self):
+        """
+        Checks the loaded decks every flush_period seconds and writes the reviews of any deck whose oldest waiting
+        review is older than its flush_interval. Runs until it is cancelled
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        while True:
+            await asyncio.sleep(self.flush_period)
+            for name, deck in list(self.decks.items()):
+                if not deck.reviewsStale():
+                    continue
+                async with self.locks[name]:
+                    if deck.reviewsStale(): #a request may have written them while waiting for the lock
+                        await asyncio.to_thread(deck.flushReviews)
+
+    def cardJson(self,card):
+        return {"row": card.row, "question": card.question, "answer": card.answer, "date_created": card.date,
+                "cur_interval": card.cur_interval, "ease_factor": card.ease_factor, "times_reviewed": card.times_reviewed,
+                "times_failed": card.times_failed, "times_correct": card.times_correct,
+                "next_due": formatTimestamp(card.next_due)}
+
+    def nextCard(self,deck,query,body):
+        schedule = deck.study_deck
+        if schedule.priority_deck.isEmpty():
+            return {"card": None, "next_due": None}
+        card = schedule.getNextCard()
+        if card.next_due > time.time():
+            return {"card": None, "next_due": formatTimestamp(card.next_due)}
+        return {"card": self.cardJson(card), "due": schedule.dueCount()}
+
+    def gradeCard(self,deck,query,body):
+        try:
+            card = deck.row_index[int(body["row"])]
+            grade = int(body["grade"])
+        except (KeyError, TypeError, ValueError):
+            raise RequestError(400, "expected a JSON body with the row of a card in the deck and a grade")
+        if grade not in (1, 2, 3, 4):
+            raise RequestError(400, "grade must be 1 (Again), 2 (Hard), 3 (Good), or 4 (Easy)")
+        deck.study_deck.gradeCard(card, grade)
+        deck.logReview(card)
+        return {"card": self.cardJson(card)}
+
+    def searchCards(self,deck,query,body):
+        words = query.get("q", [""])[0]
+        try:
+            limit = int(query.get("limit", ["20"])[0])
+        except ValueError:
+            raise RequestError(400, "limit must be a number")
+        return {"cards": [self.cardJson(card) for card in deck.searchCards(words, limit)]}
+
+    def dueCards(self,deck,query,body):
+        return {"due": deck.study_deck.dueCount(), "forecast": deck.study_deck.dueForecast(7)}
+
+    async def route(self,method,target,body):
+        """
+        Runs the operation a request asks for
+
+        GET /decks lists the decks, and every other route is under /decks/<deck file name>/:
+        GET next for the next due card, POST grade with {"row": row, "grade": 1-4} to answer a card,
+        GET search?q=words&limit=20 for a keyword search, and GET due for the due count and forecast
+
+        Parameters:
+        method (str): The HTTP method
+        target (str): The request's path and query string
+        body (bytes): The request's body
+
+        Returns:
+        dict or list: The response to send back as JSON
+        """
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+        if parts == ["decks"] and method == "GET":
+            async with self.catalog_lock:
+                return await asyncio.to_thread(self.listDecks)
+        if len(parts) != 3 or parts[0] != "decks":
+            raise RequestError(404, "not found")
+        name, action = parts[1], parts[2]
+        handler = self.routes.get((method, action))
+        if handler is None:
+            raise RequestError(404 if action not in {route[1] for route in self.routes} else 405, "not found")
+        #a loaded deck is known to exist, only other names need the directory listed, which also stops names from
+        #reaching outside the deck directory
+        if name not in self.decks and name not in listDeckFiles(self.path):
+            raise RequestError(404, f"no deck named {name}")
+        try:
+            body = json.loads(body) if body else {}
+        except ValueError:
+            raise RequestError(400, "the body is not valid JSON")
+        lock = self.locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            deck = await self.getDeck(name)
+            return await asyncio.to_thread(handler, deck, parse_qs(url.query), body)
+
+    async def handle(self,reader,writer):
+        """
+        Serves the requests of one connection, keeping it open between requests unless the client closes it
+
+        Parameters:
+        reader (asyncio.StreamReader): The connection's input
+        writer (asyncio.StreamWriter): The connection's output
+
+        Returns:
+        None
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "bad request"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    status, response = 200, await self.route(method, target, body)
+                except RequestError as e:
+                    status, response = e.status, {"error": e.message}
+                except Exception as e:
+                    status, response = 500, {"error": str(e)}
+                await self.respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self,writer,status,response,keep_alive):
+        body = json.dumps(response).encode()
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+        writer.write(f"HTTP/1.1 {status} {reasons.get(status, '')}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+        await writer.drain()
+
+    async def start(self,host="127.0.0.1",port=8080):
+        """
+        Starts listening for connections and the timer that writes waiting reviews
+
+        Parameters:
+        host (str): The address to listen on (Defaults to only this machine)
+        port (int): The port to listen on, 0 picks a free port (Defaults to 8080)
+
+        Returns:
+        asyncio.Server: The running server
+        """
+        server = await asyncio.start_server(self.handle, host, port)
+        self.flush_task = asyncio.create_task(self.flushStale())
+        return server
+
+    def close(self):
+        """
+        Stops the timer and writes every loaded deck's pending reviews to its file
+
+        Parameters:
+        None
+
+        Returns:
+        None
+        """
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        for deck in self.decks.values():
+            deck.flushReviews()
+            deck.store.flush()
+
+class RequestError(Exception):
+    def __init__(self,status,message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+async def serve(path, host="127.0.0.1", port=8080):
+    deck_server = DeckServer(path)
+    server = await deck_server.start(host, port)
+    print(f"Serving decks from {path} on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        deck_server.close()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(directory, port=int(sys.argv[1]) if len(sys.argv) > 1 else 8080))
+    except KeyboardInterrupt:
+        pass
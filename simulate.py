@@ -0,0 +1,205 @@
+import argparse, contextlib, csv, io, itertools, json, os, sys
+from concurrent.futures import ProcessPoolExecutor
+
+from Flashcard import Deck, DeckSchedule, np, parseTimestamp
+
+def simulate(interval_modify=1, hard_multiplier=1.2, easy_bonus=1.5, decks=10, cards=1000, days=365, new_per_day=20,
+             start_stability=1.0, growth=2.5, lapse=0.5, first_recall=0.5, seed=0):
+    """
+    Simulates studying many decks every day with the same rules as DeckSchedule.gradeCard. All the cards of all the
+    decks are kept in NumPy arrays and every day's reviews are worked out at once
+
+    Answers come from a simple memory model. Every card has a stability, the days after a review until the chance of
+    remembering it drops to 90%, and the chance of remembering a card is 0.9 ** (days since review / stability). A
+    remembered card is answered Hard, Good, or Easy depending on how likely it was to be remembered, and its stability
+    grows more the closer it was to being forgotten. A forgotten card is answered Again, loses stability, and is shown
+    again in the same session where it is answered Good, the same as again_delay being 0
+
+    Parameters
+    interval_modify (float): The schedule's interval modifier (Defaults to 1)
+    hard_multiplier (float): How much an answer of Hard multiplies the interval by (Defaults to 1.2)
+    easy_bonus (float): How much an answer of Easy adds to the ease factor (Defaults to 1.5)
+    decks (int): The number of decks (Defaults to 10)
+    cards (int): The number of cards in each deck (Defaults to 1000)
+    days (int): The number of days to simulate (Defaults to 365)
+    new_per_day (int): How many cards of each deck are studied for the first time each day (Defaults to 20)
+    start_stability (float): The average stability of a card after it is first learned, in days (Defaults to 1)
+    growth (float): How much a review multiplies the stability by when the card was reviewed at 90% (Defaults to 2.5)
+    lapse (float): How much forgetting a card multiplies its stability by (Defaults to 0.5)
+    first_recall (float): The chance of knowing a card the first time it is studied (Defaults to 0.5)
+    seed (int): The seed of the random answers (Defaults to 0)
+
+    Returns
+    dict: The parameters, the reviews on each day, the average retention on each day, and a summary
+    """
+    if np is None:
+        raise RuntimeError("the simulation needs NumPy")
+    rng = np.random.default_rng(seed)
+    schedule = DeckSchedule(interval_modify, "review_time", hard_multiplier, easy_bonus)
+    total = decks * cards
+    ease = np.full(total, 2.5)
+    next_due = np.tile(np.arange(cards) // new_per_day, decks).astype(float) #new cards are due the day they are introduced
+    last_review = np.full(total, np.nan) #nan until a card is studied for the first time
+    stability = start_stability * rng.lognormal(0, 0.5, total)
+
+    reviews_per_day = np.zeros(days, dtype=np.int64)
+    retention_per_day = np.zeros(days)
+    remembered = reviewed = 0
+    for day in range(days):
+        studied = ~np.isnan(last_review)
+        if studied.any():
+            retention_per_day[day] = np.mean(0.9 ** ((day - last_review[studied]) / stability[studied]))
+        due = np.flatnonzero(next_due < day + 1)
+        if due.size == 0:
+            continue
+
+        new = np.isnan(last_review[due])
+        recall = np.where(new, first_recall, 0.9 ** ((day - np.nan_to_num(last_review[due])) / stability[due]))
+        knew = rng.random(due.size) < recall
+        grades = np.where(~knew, 1, np.where(recall < 0.85, 2, np.where(recall < 0.97, 3, 4)))
+        remembered += int(np.count_nonzero(knew & ~new))
+        reviewed += int(np.count_nonzero(~new))
+
+        card_ease = ease[due]
+        #a card answered Again is shown again right away and answered Good, Again leaves the ease factor as it is
+        next_due[due] = day + schedule.nextInterval(card_ease, np.where(grades == 1, 3, grades))
+        ease[due] = schedule.nextEase(card_ease, grades)
+        reviews_per_day[day] = due.size + int(np.count_nonzero(grades == 1))
+
+        old = due[~new]
+        stability[old] = np.where(knew[~new], stability[old] * (1 + (growth - 1) * (1 - recall[~new]) / 0.1),
+                                  np.maximum(stability[old] * lapse, 0.5))
+        last_review[due] = day
+
+    return {"interval_modify": interval_modify, "hard_multiplier": hard_multiplier, "easy_bonus": easy_bonus,
+            "reviews_per_day": reviews_per_day.tolist(), "retention_per_day": retention_per_day.round(4).tolist(),
+            "summary": summarize(reviews_per_day, retention_per_day, remembered, reviewed, decks * cards, days)}
+
+def summarize(reviews_per_day, retention_per_day, remembered, reviewed, cards, days):
+    settled = retention_per_day[days // 2:] #the second half, after most cards have been introduced
+    return {"total_reviews": int(reviews_per_day.sum()), "reviews_per_card": float(reviews_per_day.sum() / cards),
+            "mean_reviews_per_day": float(reviews_per_day.mean()), "peak_reviews_per_day": int(reviews_per_day.max()),
+            "mean_retention": float(settled.mean()) if settled.size else 0.0,
+            "recall_at_review": remembered / reviewed if reviewed else None}
+
+def replay(reviewFile, deckPath, deckName, interval_modify=1, hard_multiplier=1.2, easy_bonus=1.5, days=30):
+    """
+    Replays recorded review results, in the format Deck.ingestReviews reads, over a deck with a set of parameters
+    without saving anything. Since the answers are fixed the result is how the schedule would have spaced them:
+    how many reviews came before the card would have been due and how many cards would be due over the next days
+
+    Parameters
+    reviewFile (str): The path of the review results file
+    deckPath (str): The directory of the deck
+    deckName (str): The file name of the deck
+    interval_modify (float): The schedule's interval modifier (Defaults to 1)
+    hard_multiplier (float): How much an answer of Hard multiplies the interval by (Defaults to 1.2)
+    easy_bonus (float): How much an answer of Easy adds to the ease factor (Defaults to 1.5)
+    days (int): The number of days after the last review to count due cards for (Defaults to 30)
+
+    Returns
+    dict: The parameters and the results of the replay
+    """
+    deck = Deck(deckPath)
+    deck.deckName = deckName
+    deck.study_deck = DeckSchedule(interval_modify, "review_time", hard_multiplier, easy_bonus)
+    deck.snapshot_min_cards = float("inf") #a replay never writes anything next to the deck
+    with contextlib.redirect_stdout(io.StringIO()):
+        if deck.extractDeck() is None:
+            raise RuntimeError(f"could not load {deckName}")
+    grades = {"again": 1, "hard": 2, "good": 3, "easy": 4}
+    applied = early = 0
+    last = 0.0
+    reviews = []
+    with open(reviewFile, "r", newline="") as f:
+        for line in csv.reader(f):
+            if len(line) != 3:
+                continue
+            grade = grades.get(line[1].strip().lower(), line[1].strip())
+            now = parseTimestamp(line[2].strip())
+            card = deck.findCard(line[0])
+            if str(grade) not in ("1", "2", "3", "4") or not now or card is None:
+                continue
+            reviews.append((now, card, int(grade)))
+    reviews.sort(key=lambda review: review[0]) #oldest first, the same order Deck.ingestReviews applies them in
+    for now, card, grade in reviews:
+        if now < card.next_due:
+            early += 1
+        deck.study_deck.gradeCard(card, grade, now)
+        applied += 1
+        last = max(last, now)
+    intervals = [float(card.cur_interval) for card in deck.deck]
+    return {"interval_modify": interval_modify, "hard_multiplier": hard_multiplier, "easy_bonus": easy_bonus,
+            "summary": {"reviews": applied, "early_reviews": early,
+                        "mean_interval": sum(intervals) / len(intervals) if intervals else 0.0,
+                        "due_per_day": deck.study_deck.dueForecast(days, last or None)}}
+
+def runSimulation(settings):
+    kind, params, options = settings
+    if kind == "replay":
+        return replay(**options, **params)
+    return simulate(**options, **params)
+
+def sweep(grid, options, kind="simulate", workers=None):
+    """
+    Runs a simulation or replay for every combination of parameters, spread over a pool of worker processes
+
+    Parameters
+    grid (dict): The values to try of each parameter, such as {"interval_modify": [0.8, 1, 1.2]}
+    options (dict): The other arguments of simulate or replay, the same for every run
+    kind (str): "simulate" or "replay" (Defaults to "simulate")
+    workers (int): The number of worker processes (Defaults to the number of CPUs)
+
+    Returns
+    list: The result of every run, in the order of the grid
+    """
+    names = list(grid)
+    runs = [(kind, dict(zip(names, values)), options) for values in itertools.product(*grid.values())]
+    if len(runs) == 1:
+        return [runSimulation(runs[0])]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(runSimulation, runs))
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulates the review schedule for different parameters and prints the results as JSON")
+    parser.add_argument("--interval-modify", type=float, nargs="+", default=[1.0], help="interval modifiers to try (default: 1)")
+    parser.add_argument("--hard-multiplier", type=float, nargs="+", default=[1.2], help="Hard interval multipliers to try (default: 1.2)")
+    parser.add_argument("--easy-bonus", type=float, nargs="+", default=[1.5], help="Easy ease bonuses to try (default: 1.5)")
+    parser.add_argument("--decks", type=int, default=10, help="number of simulated decks (default: 10)")
+    parser.add_argument("--cards", type=int, default=1000, help="cards in each simulated deck (default: 1000)")
+    parser.add_argument("--days", type=int, default=365, help="days to simulate (default: 365)")
+    parser.add_argument("--new-per-day", type=int, default=20, help="new cards studied in each deck each day (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the simulated answers")
+    parser.add_argument("--replay", metavar="REVIEWS", help="replay a review results file instead of simulating answers")
+    parser.add_argument("--deck", help="the deck file the replayed reviews belong to")
+    parser.add_argument("--forecast-days", type=int, default=30, help="days to count due cards for after a replay (default: 30)")
+    parser.add_argument("--workers", type=int, help="worker processes for the sweep (default: number of CPUs)")
+    parser.add_argument("--daily", action="store_true", help="include the reviews and retention of every day in the output")
+    parser.add_argument("--output", help="write the JSON results to this file instead of printing them")
+    args = parser.parse_args()
+
+    grid = {"interval_modify": args.interval_modify, "hard_multiplier": args.hard_multiplier, "easy_bonus": args.easy_bonus}
+    if args.replay:
+        if not args.deck:
+            parser.error("--replay needs --deck")
+        deckPath, deckName = os.path.split(os.path.abspath(args.deck))
+        results = sweep(grid, {"reviewFile": args.replay, "deckPath": deckPath, "deckName": deckName,
+                               "days": args.forecast_days}, "replay", args.workers)
+    else:
+        if np is None:
+            sys.exit("The simulation needs NumPy, install it with: pip install numpy")
+        results = sweep(grid, {"decks": args.decks, "cards": args.cards, "days": args.days,
+                               "new_per_day": args.new_per_day, "seed": args.seed}, "simulate", args.workers)
+        if not args.daily:
+            for result in results:
+                del result["reviews_per_day"], result["retention_per_day"]
+
+    report = json.dumps({"results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()